@@ -3,6 +3,8 @@
 
 from flask_sqlalchemy import SQLAlchemy
 from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
 import logging
 from pathlib import Path
 import os
@@ -38,4 +40,24 @@ def init_db(app: Flask) -> None:
             
     except Exception as e:
         logger.error(f"Database initialization failed: {str(e)}")
-        raise
\ No newline at end of file
+        raise
+
+def enable_fast_sqlite_writes(engine: Engine) -> None:
+    """
+    Tune new SQLite connections for bulk writes from maintenance scripts.
+    
+    WAL journaling with synchronous=NORMAL fsyncs at checkpoints rather than
+    on every commit. Call before the engine opens its first connection.
+    
+    Args:
+        engine: Engine the script writes through
+    """
+    if engine.dialect.name != 'sqlite':
+        return
+    
+    @event.listens_for(engine, 'connect')
+    def set_sqlite_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.close()
@@ -2,10 +2,12 @@
 Logger configuration for the application.
 """
 
+import atexit
 import logging
+import queue
 import sys
 from pathlib import Path
-from logging.handlers import RotatingFileHandler
+from logging.handlers import MemoryHandler, QueueHandler, QueueListener, RotatingFileHandler
 
 def setup_logging(app=None):
     """Configure logging for the application."""
@@ -48,6 +50,34 @@ def setup_logging(app=None):
     
     return root_logger
 
+def setup_queued_logging(level: int = logging.INFO,
+                         fmt: str = '%(asctime)s [%(levelname)s] %(message)s',
+                         log_file: str = 'logs/backend.log') -> QueueListener:
+    """Configure root logging so callers only enqueue records.
+    
+    A QueueListener thread writes them to the console and, through a
+    MemoryHandler, to log_file in batches; ERROR and above flush at once.
+    Returns the started listener, which is stopped at exit.
+    """
+    formatter = logging.Formatter(fmt)
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(formatter)
+    file_handler = logging.FileHandler(log_file)
+    file_handler.setFormatter(formatter)
+    buffered_handler = MemoryHandler(capacity=1024, flushLevel=logging.ERROR, target=file_handler)
+    
+    # queue.Queue rather than SimpleQueue: eventlet's monkey patching makes it
+    # green-thread aware, so the listener never blocks the hub
+    log_queue = queue.Queue(-1)
+    listener = QueueListener(log_queue, console_handler, buffered_handler,
+                             respect_handler_level=True)
+    queue_handler = QueueHandler(log_queue)
+    queue_handler.setFormatter(logging.Formatter('%(message)s'))  # Full format applied by the listener
+    logging.basicConfig(level=level, handlers=[queue_handler])
+    listener.start()
+    atexit.register(listener.stop)
+    return listener
+
 # Create logger instance
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.INFO)
@@ -12,16 +12,11 @@ import os
 import sys
 from flask_socketio import SocketIO
 import logging
+from app.logger import setup_queued_logging
+
+# Configure logging; records are written by a background listener
+setup_queued_logging(level=logging.INFO)
 
-# Configure logging
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('logs/backend.log')
-    ]
-)
 logger = logging.getLogger(__name__)
 
 def main():
@@ -14,7 +14,7 @@ Date: 2024
 from flask import Blueprint, request, jsonify
 from ..database import db
 from ..models import MediaAsset as Asset, ProcessingResult
-from ..websocket import send_processing_update
+from ..extensions import socketio
 import logging
 
 # Initialize blueprint and logger
@@ -58,7 +58,7 @@ def handle_processing_webhook():
         db.session.commit()
         
         # Notify clients via WebSocket
-        send_processing_update({
+        socketio.emit('message', {
             'type': 'processing_complete',
             'asset_id': asset_id,
             'results_count': len(results)
@@ -8,8 +8,9 @@
 Utility functions for file operations, particularly for handling media file streaming.
 """
 import os
+import re
 import fcntl
-from typing import Generator
+from typing import Generator, Iterable
 
 def file_reader(file_path: str) -> Generator[bytes, None, None]:
     """
@@ -67,4 +68,32 @@ def partial_file_reader(file_path: str, start_byte: int, length: int) -> Generat
             # Release the lock
             fcntl.flock(f.fileno(), fcntl.LOCK_UN)
     except IOError as e:
-        raise IOError(f"Error reading file {file_path}: {str(e)}") 
\ No newline at end of file
+        raise IOError(f"Error reading file {file_path}: {str(e)}")
+
+def iter_media_files(root: str, extensions: Iterable[str]) -> Generator[os.DirEntry, None, None]:
+    """
+    Walk a directory tree once, yielding files whose suffix is in extensions.
+    Uses os.scandir so each entry is listed once and its type comes from the
+    directory listing rather than a separate stat() call.
+    
+    Args:
+        root (str): Directory to walk
+        extensions (Iterable[str]): Suffixes such as '.mp4', matched case-insensitively
+        
+    Yields:
+        os.DirEntry: Matching file entries
+    """
+    # One anchored, case-insensitive alternation tested per name, so names
+    # are not lowercased into new strings
+    suffix_re = re.compile(
+        r'\.(?:' + '|'.join(re.escape(ext.lstrip('.')) for ext in extensions) + r')$',
+        re.IGNORECASE
+    )
+    stack = [os.fspath(root)]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif suffix_re.search(entry.name):
+                    yield entry
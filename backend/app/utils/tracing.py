@@ -27,14 +27,15 @@ from typing import Dict, List, Optional, Any
 from datetime import datetime
 import logging
 import json
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass
 
 logger = logging.getLogger(__name__)
 
 # Context variable to track current trace
 current_trace = contextvars.ContextVar('current_trace', default=None)
+_get_trace = current_trace.get
 
-@dataclass
+@dataclass(slots=True)
 class TraceSpan:
     """Single unit of work within a trace"""
     id: str
@@ -52,17 +53,24 @@ class TraceSpan:
         return 0
     
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary for logging"""
-        return {
+        """
+        Convert to dictionary for logging, omitting empty fields.
+        Times are raw epoch seconds; formatting them is left to the reader.
+        """
+        data = {
             'id': self.id,
-            'parent_id': self.parent_id,
             'name': self.name,
             'duration_ms': self.duration(),
-            'start_time': datetime.fromtimestamp(self.start_time).isoformat(),
-            'end_time': datetime.fromtimestamp(self.end_time).isoformat() if self.end_time else None,
-            'metadata': self.metadata,
-            'error': self.error
+            'start_time': self.start_time,
+            'end_time': self.end_time
         }
+        if self.parent_id:
+            data['parent_id'] = self.parent_id
+        if self.metadata:
+            data['metadata'] = self.metadata
+        if self.error:
+            data['error'] = self.error
+        return data
 
 class RequestTrace:
     """Complete trace of a request through the system"""
@@ -101,6 +109,7 @@ class RequestTrace:
         """Convert entire trace to dictionary"""
         return {
             'trace_id': self.trace_id,
+            'start_time': datetime.fromtimestamp(self.start_time).isoformat(),
             'duration_ms': (time.time() - self.start_time) * 1000,
             'spans': [span.to_dict() for span in self.spans],
             'metadata': self.metadata
@@ -110,25 +119,82 @@ class RequestTrace:
         """Log the trace for debugging"""
         logger.info(f"Request trace {self.trace_id}:\n{json.dumps(self.to_dict(), indent=2)}")
 
-def trace_request(name: str, metadata: Dict[str, Any] = None):
+def trace_request(name: str, metadata: Dict[str, Any] = None, root: bool = False):
     """
     Decorator to trace a request or operation
     
+    Root operations (request entry points) create the trace if none is
+    active and log it when they finish. Child operations only add a span
+    to the active trace and skip the context lookup/set round-trip; with
+    no active trace they call straight through.
+    
     Usage:
-    @trace_request('get_asset')
+    @trace_request('get_asset', root=True)
     async def get_asset(asset_id):
         ...
+    
+    @trace_request('load_metadata')
+    def load_metadata(asset):
+        ...
     """
     def decorator(func):
+        is_async = asyncio.iscoroutinefunction(func)
+        
+        if root:
+            @functools.wraps(func)
+            async def async_root_wrapper(*args, **kwargs):
+                # Get or create trace
+                trace = _get_trace()
+                token = None
+                if not trace:
+                    trace = RequestTrace()
+                    token = current_trace.set(trace)
+                
+                # Create span
+                span = trace.add_span(name, metadata=metadata)
+                try:
+                    result = await func(*args, **kwargs)
+                    trace.end_span(span.id)
+                    return result
+                except Exception as e:
+                    trace.end_span(span.id, error=e)
+                    raise
+                finally:
+                    if token is not None:  # We own the trace
+                        trace.log()
+                        current_trace.reset(token)
+                        
+            @functools.wraps(func)
+            def sync_root_wrapper(*args, **kwargs):
+                # Get or create trace
+                trace = _get_trace()
+                token = None
+                if not trace:
+                    trace = RequestTrace()
+                    token = current_trace.set(trace)
+                
+                # Create span
+                span = trace.add_span(name, metadata=metadata)
+                try:
+                    result = func(*args, **kwargs)
+                    trace.end_span(span.id)
+                    return result
+                except Exception as e:
+                    trace.end_span(span.id, error=e)
+                    raise
+                finally:
+                    if token is not None:  # We own the trace
+                        trace.log()
+                        current_trace.reset(token)
+            
+            return async_root_wrapper if is_async else sync_root_wrapper
+        
         @functools.wraps(func)
         async def async_wrapper(*args, **kwargs):
-            # Get or create trace
-            trace = current_trace.get()
-            if not trace:
-                trace = RequestTrace()
-                current_trace.set(trace)
+            trace = _get_trace()
+            if trace is None:
+                return await func(*args, **kwargs)
             
-            # Create span
             span = trace.add_span(name, metadata=metadata)
             try:
                 result = await func(*args, **kwargs)
@@ -137,19 +203,13 @@ def trace_request(name: str, metadata: Dict[str, Any] = None):
             except Exception as e:
                 trace.end_span(span.id, error=e)
                 raise
-            finally:
-                if not span.parent_id:  # Root span
-                    trace.log()
-                    
+                
         @functools.wraps(func)
         def sync_wrapper(*args, **kwargs):
-            # Get or create trace
-            trace = current_trace.get()
-            if not trace:
-                trace = RequestTrace()
-                current_trace.set(trace)
+            trace = _get_trace()
+            if trace is None:
+                return func(*args, **kwargs)
             
-            # Create span
             span = trace.add_span(name, metadata=metadata)
             try:
                 result = func(*args, **kwargs)
@@ -158,11 +218,8 @@ def trace_request(name: str, metadata: Dict[str, Any] = None):
             except Exception as e:
                 trace.end_span(span.id, error=e)
                 raise
-            finally:
-                if not span.parent_id:  # Root span
-                    trace.log()
         
-        return async_wrapper if asyncio.iscoroutinefunction(func) else sync_wrapper
+        return async_wrapper if is_async else sync_wrapper
     return decorator
 
 def get_current_trace() -> Optional[RequestTrace]:
@@ -5,7 +5,7 @@ Cloud Processing Package for MAM System
 This package provides cloud-based video processing capabilities using AWS services.
 """
 
-from .processing_manager import CloudProcessingManager
+from .processing_manager import CloudProcessingManager, get_processing_manager
 from .frame_extractor import FrameExtractor
 
-__all__ = ['CloudProcessingManager', 'FrameExtractor'] 
\ No newline at end of file
+__all__ = ['CloudProcessingManager', 'FrameExtractor', 'get_processing_manager'] 
\ No newline at end of file
@@ -4,17 +4,21 @@ backend/cloud/frame_extractor.py
 Frame Extraction Module for Cloud Processing
 ==========================================
 
-This module handles intelligent frame extraction from videos using OpenCV and PySceneDetect.
+This module handles intelligent frame extraction from videos using OpenCV (or PyAV)
+and PySceneDetect.
 It implements a comprehensive approach:
 1. Content-aware scene detection for major changes
-2. Full frame extraction (no sampling)
+2. Full frame extraction (optional fixed-step sampling)
 3. Rich metadata extraction per frame
 
 Key Features:
-- Complete frame processing without sampling
+- Complete frame processing, or every Nth frame via frame_step
 - Memory-efficient processing using generators
 - Rich metadata extraction per frame
 - Progress tracking and async support
+- Optional PyAV decoder backend (GIL released during decode)
+- Optional NVDEC hardware decoding through PyAV
+- Optional ffmpeg subprocess backend (decode runs outside the interpreter)
 
 Author: Senior Developer
 Date: February 2024
@@ -22,12 +26,47 @@ Date: February 2024
 
 import cv2
 import numpy as np
-from scenedetect import detect, ContentDetector
+from scenedetect import open_video, SceneManager, ContentDetector
 from pathlib import Path
-from typing import Generator, Dict, Any, AsyncGenerator
+from typing import Generator, Dict, Any, AsyncGenerator, List, Optional, Tuple
 import asyncio
+import bisect
+import hashlib
+import json
 import logging
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from datetime import timedelta
+from functools import lru_cache
+
+# Shared TurboJPEG encoder; None until first use, False if unavailable
+_turbojpeg = None
+
+def _get_turbojpeg():
+    """Return the shared TurboJPEG instance, or None if PyTurboJPEG is missing"""
+    global _turbojpeg
+    if _turbojpeg is None:
+        try:
+            from turbojpeg import TurboJPEG  # Optional dependency
+            _turbojpeg = TurboJPEG()
+        except (ImportError, OSError) as e:
+            # Missing bindings or libturbojpeg shared library
+            logging.getLogger(__name__).info(f"TurboJPEG unavailable, using OpenCV encoder: {e}")
+            _turbojpeg = False
+    return _turbojpeg or None
+
+@lru_cache(maxsize=128)
+def _content_digest(video_path: str, mtime_ns: int, size: int) -> str:
+    """
+    SHA-1 of a video's size and first MB. Memoized per (path, mtime, size)
+    so repeat lookups for an unchanged file skip the read.
+    """
+    digest = hashlib.sha1()
+    with open(video_path, 'rb') as f:
+        digest.update(f.read(1 << 20))
+    digest.update(str(size).encode())
+    return digest.hexdigest()
 
 class FrameExtractor:
     """
@@ -35,14 +74,67 @@ class FrameExtractor:
     Processes every frame for maximum accuracy.
     """
     
-    def __init__(self, sample_rate: int = 30):
+    BACKENDS = ('opencv', 'pyav', 'decord', 'ffmpeg')
+    SCENE_DOWNSCALE = 4  # Scene detection runs at 1/4 width and height
+    SCENE_THRESHOLD = 27.0  # HSV content delta for a cut (ContentDetector default)
+    MIN_SCENE_LEN = 15  # Minimum frames between cuts (ContentDetector default)
+    FRAME_QUEUE_SIZE = 8  # Decoded frames buffered ahead of the consumer
+    
+    def __init__(self, sample_rate: int = 30, backend: str = 'opencv', frame_step: int = 1,
+                 scene_cache_dir: Optional[str] = None, hwaccel: Optional[bool] = None,
+                 reuse_buffers: bool = False, detect_scenes: bool = True):
         """
         Initialize frame extractor.
         Args:
             sample_rate: Default FPS, not used for sampling anymore
+            backend: Video decoder to use - 'opencv', 'pyav', 'decord' or
+                'ffmpeg'. PyAV releases the GIL while decoding, so concurrent
+                extractions overlap. decord reads sampled frames in batches,
+                which is fastest for large frame_step values. ffmpeg decodes
+                in a separate process and pipes raw frames, with frame_step
+                sampling done by ffmpeg itself.
+            frame_step: Yield every Nth frame (1 = every frame). Skipped frames
+                are only grabbed, never converted to BGR.
+            scene_cache_dir: Directory for cached scene lists, defaults to
+                $SCENE_CACHE_DIR or the system temp dir (/tmp on Lambda)
+            hwaccel: Decode on the GPU with NVDEC (pyav backend only). Defaults
+                to the NVDEC environment variable; falls back to CPU decoding
+                when CUDA is unavailable.
+            reuse_buffers: Decode into a fixed ring of preallocated frame
+                buffers (opencv backend only) instead of allocating a new
+                array per frame. A yielded frame is overwritten once the
+                ring wraps, so consumers must encode or copy it before
+                requesting the next one.
+            detect_scenes: Run scene detection for frame metadata. When False
+                the whole video is treated as one scene, so scene_id is
+                always 0, saving a second decode pass.
         """
+        if backend not in self.BACKENDS:
+            raise ValueError(f"Unsupported backend: {backend}")
+        if frame_step < 1:
+            raise ValueError("frame_step must be at least 1")
+        self.backend = backend
+        self.frame_step = frame_step
+        self.scene_cache_dir = Path(
+            scene_cache_dir or os.getenv('SCENE_CACHE_DIR') or tempfile.gettempdir()
+        )
+        if hwaccel is None:
+            hwaccel = os.getenv('NVDEC', '').lower() in ('1', 'true', 'yes')
+        self.hwaccel = hwaccel
+        self.reuse_buffers = reuse_buffers
+        self.detect_scenes = detect_scenes
         self.logger = logging.getLogger(__name__)
     
+    def _scene_cache_key(self, video_path: str) -> str:
+        """
+        Content hash identifying a video for the scene cache.
+        Hashes the file size and first MB, plus the detection settings.
+        """
+        stat = os.stat(video_path)
+        content = _content_digest(os.path.abspath(video_path), stat.st_mtime_ns, stat.st_size)
+        settings = f"{self.SCENE_DOWNSCALE}:{self.SCENE_THRESHOLD}:{self.MIN_SCENE_LEN}"
+        return hashlib.sha1(f"{content}:{settings}".encode()).hexdigest()
+    
     async def extract_scenes(self, video_path: str) -> list:
         """
         Detect scene boundaries using content-aware detection.
@@ -52,29 +144,97 @@ class FrameExtractor:
             List of scene timestamps (start, end) in seconds
         """
         try:
-            # Use PySceneDetect for accurate scene detection
-            scenes = detect(video_path, ContentDetector())
-            return [(scene[0].get_seconds(), scene[1].get_seconds()) 
-                    for scene in scenes]
+            # Reuse scenes detected on a previous run of the same content
+            cache_file = self.scene_cache_dir / f"scd_{self._scene_cache_key(video_path)}.json"
+            if cache_file.exists():
+                self.logger.info(f"Using cached scenes: {cache_file}")
+                return [tuple(scene) for scene in json.loads(cache_file.read_text())]
+            
+            # Use PySceneDetect on downscaled frames; the content detector
+            # only compares HSV deltas, so full resolution buys nothing
+            video = open_video(video_path)
+            scene_manager = SceneManager()
+            scene_manager.add_detector(ContentDetector(threshold=self.SCENE_THRESHOLD,
+                                                       min_scene_len=self.MIN_SCENE_LEN))
+            # downscale is ignored while auto_downscale is on
+            scene_manager.auto_downscale = False
+            scene_manager.downscale = self.SCENE_DOWNSCALE
+            scene_manager.detect_scenes(video)
+            scenes = [(scene[0].get_seconds(), scene[1].get_seconds())
+                      for scene in scene_manager.get_scene_list(start_in_scene=True)]
+            
+            # Cache successful detections only
+            try:
+                self.scene_cache_dir.mkdir(parents=True, exist_ok=True)
+                cache_file.write_text(json.dumps(scenes))
+            except OSError as e:
+                self.logger.warning(f"Failed to cache scenes: {e}")
+            return scenes
         except Exception as e:
             self.logger.error(f"Scene detection failed: {e}")
             # Fallback to single scene if detection fails
             cap = cv2.VideoCapture(video_path)
+            cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
             duration = cap.get(cv2.CAP_PROP_FRAME_COUNT) / cap.get(cv2.CAP_PROP_FPS)
             cap.release()
             return [(0, duration)]
     
-    async def extract_frames(self, video_path: str) -> AsyncGenerator[Dict[str, Any], None]:
+    async def _frame_scenes(self, video_path: str, duration: float,
+                            detect_scenes: Optional[bool] = None) -> list:
+        """Scenes used for frame metadata; a single scene if detection is off"""
+        if detect_scenes is None:
+            detect_scenes = self.detect_scenes
+        if not detect_scenes:
+            return [(0.0, duration)]
+        return await self.extract_scenes(video_path)
+    
+    @staticmethod
+    def _scene_index(scene_starts: List[float], frame_time: float) -> int:
+        """Binary-search the scene containing frame_time"""
+        return max(0, bisect.bisect_right(scene_starts, frame_time) - 1)
+    
+    @staticmethod
+    def _frame_metadata(frame: np.ndarray, frame_time: float, frame_number: int,
+                        fps: float, scenes: list, scene_id: int) -> Dict[str, Any]:
+        """Build the per-frame metadata dict"""
+        scene_start, scene_end = scenes[scene_id]
+        return {
+            'timestamp': frame_time,
+            'frame_number': frame_number,
+            'scene_id': scene_id,
+            'frame_type': 'scene_change' if abs(frame_time - scene_start) < 1/fps else 'content',
+            'resolution': (frame.shape[1], frame.shape[0]),
+            'scene_progress': (frame_time - scene_start) / (scene_end - scene_start)
+        }
+    
+    async def extract_frames(self, video_path: str, detect_scenes: Optional[bool] = None
+                             ) -> AsyncGenerator[Dict[str, Any], None]:
         """
-        Extract ALL frames with rich metadata.
+        Extract ALL frames (or every frame_step-th frame) with rich metadata.
         Args:
             video_path: Path to video file
+            detect_scenes: Override the instance detect_scenes setting
         Yields:
             Dict containing frame data and metadata
         """
+        if self.backend == 'pyav':
+            async for frame_data in self._extract_frames_pyav(video_path, detect_scenes):
+                yield frame_data
+            return
+        if self.backend == 'decord':
+            async for frame_data in self._extract_frames_decord(video_path, detect_scenes):
+                yield frame_data
+            return
+        if self.backend == 'ffmpeg':
+            async for frame_data in self._extract_frames_ffmpeg(video_path, detect_scenes):
+                yield frame_data
+            return
+        
         cap = cv2.VideoCapture(video_path)
         if not cap.isOpened():
             raise ValueError(f"Failed to open video: {video_path}")
+        # Keep a single decoded frame buffered instead of the default 4
+        cap.set(cv2.CAP_PROP_BUFFERSIZE, 1)
             
         try:
             # Get video properties
@@ -86,61 +246,462 @@ class FrameExtractor:
             self.logger.info(f"Processing video: {fps} fps, {frame_count} frames, {duration:.2f} seconds")
             
             # Detect scenes for metadata
-            scenes = await self.extract_scenes(video_path)
-            current_scene = 0
-            next_scene_start = scenes[1][0] if len(scenes) > 1 else duration
+            scenes = await self._frame_scenes(video_path, duration, detect_scenes)
+            scene_starts = [start for start, _ in scenes]
             
-            # Process every single frame
-            frame_number = 0
-            while True:
-                ret, frame = cap.read()
-                if not ret:
+            # Decode in a background task so decoding overlaps with the consumer;
+            # the bounded queue caps how many decoded frames are held in memory
+            queue = asyncio.Queue(maxsize=self.FRAME_QUEUE_SIZE)
+            stop = asyncio.Event()
+            decoder = asyncio.create_task(self._decode_loop(cap, queue, stop))
+            
+            try:
+                while True:
+                    item = await queue.get()
+                    if item is None:
+                        break
+                    frame_number, frame = item
+                    
+                    # Get current frame time and scene
+                    frame_time = frame_number / fps
+                    scene_id = self._scene_index(scene_starts, frame_time)
+                    
+                    yield {
+                        'frame': frame,
+                        'metadata': self._frame_metadata(
+                            frame, frame_time, frame_number, fps, scenes, scene_id
+                        )
+                    }
+                
+                # Surface decode errors
+                await decoder
+            finally:
+                # Stop the decoder and free a pending put so it can exit
+                # before the capture is released
+                stop.set()
+                while not queue.empty():
+                    queue.get_nowait()
+                await asyncio.gather(decoder, return_exceptions=True)
+                    
+        finally:
+            cap.release()
+    
+    def _scene_hsv(self, frame: np.ndarray) -> np.ndarray:
+        """Downscaled HSV copy of a frame for content comparison"""
+        h, w = frame.shape[:2]
+        small = cv2.resize(frame, (max(1, w // self.SCENE_DOWNSCALE), max(1, h // self.SCENE_DOWNSCALE)),
+                           interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(small, cv2.COLOR_BGR2HSV)
+    
+    @staticmethod
+    def _content_delta(prev_hsv: np.ndarray, hsv: np.ndarray) -> float:
+        """Mean absolute HSV change between frames, averaged over channels"""
+        return float(cv2.absdiff(prev_hsv, hsv).mean())
+    
+    async def extract_scenes_and_frames(self, video_path: str
+                                        ) -> AsyncGenerator[Tuple[Dict[str, Any], Optional[float]], None]:
+        """
+        Detect scenes and extract frames in a single decode pass.
+        Cuts are found on the frames already decoded for extraction, using the
+        same HSV content delta as PySceneDetect's ContentDetector, instead of
+        running extract_scenes as a separate pass. With frame_step > 1 cuts are
+        detected between sampled frames. scene_progress is None because a
+        scene's end is unknown until the next cut.
+        Args:
+            video_path: Path to video file
+        Yields:
+            Tuple of (frame data, start time of a new scene or None)
+        """
+        prev_hsv = None
+        scene_id = 0
+        last_cut = 0
+        
+        async for frame_data in self.extract_frames(video_path, detect_scenes=False):
+            metadata = frame_data['metadata']
+            hsv = self._scene_hsv(frame_data['frame'])
+            
+            marker = None
+            if (prev_hsv is not None
+                    and metadata['frame_number'] - last_cut >= self.MIN_SCENE_LEN
+                    and self._content_delta(prev_hsv, hsv) >= self.SCENE_THRESHOLD):
+                scene_id += 1
+                last_cut = metadata['frame_number']
+                marker = metadata['timestamp']
+            prev_hsv = hsv
+            
+            metadata['scene_id'] = scene_id
+            metadata['frame_type'] = 'scene_change' if marker is not None or metadata['frame_number'] == 0 else 'content'
+            metadata['scene_progress'] = None
+            yield frame_data, marker
+    
+    async def extract_frame_batches(self, video_path: str, batch_size: Optional[int] = None,
+                                    fuse_scenes: bool = False
+                                    ) -> AsyncGenerator[Tuple[np.ndarray, List[Dict[str, Any]]], None]:
+        """
+        Extract frames in chunks, as one contiguous array per chunk.
+        Frames are copied into a single (N, H, W, 3) array instead of being
+        kept as separate per-frame arrays, so a chunk can be encoded as a unit.
+        Args:
+            video_path: Path to video file
+            batch_size: Frames per chunk, defaults to FRAME_QUEUE_SIZE
+            fuse_scenes: Detect scenes during extraction (see
+                extract_scenes_and_frames) rather than in a separate pass;
+                new scenes are marked with frame_type 'scene_change'
+        Yields:
+            Tuple of (frames array, per-frame metadata list)
+        """
+        batch_size = batch_size or self.FRAME_QUEUE_SIZE
+        frames = None
+        metadata = []
+        
+        if fuse_scenes and self.detect_scenes:
+            source = (frame_data async for frame_data, _ in self.extract_scenes_and_frames(video_path))
+        else:
+            source = self.extract_frames(video_path)
+        
+        async for frame_data in source:
+            frame = frame_data['frame']
+            # Flush early if the resolution changes mid-stream
+            if frames is not None and frame.shape != frames.shape[1:]:
+                yield frames[:len(metadata)], metadata
+                frames, metadata = None, []
+            if frames is None:
+                frames = np.empty((batch_size, *frame.shape), dtype=frame.dtype)
+                
+            frames[len(metadata)] = frame
+            metadata.append(frame_data['metadata'])
+            
+            if len(metadata) == batch_size:
+                yield frames, metadata
+                frames, metadata = None, []
+                
+        if metadata:
+            yield frames[:len(metadata)], metadata
+    
+    def _read_sampled(self, cap: cv2.VideoCapture, frame_number: int,
+                      buffer: Optional[np.ndarray] = None) -> tuple:
+        """
+        Blocking read of the next frame to yield.
+        Skipped frames are only grabbed, never retrieved.
+        Args:
+            buffer: Array to decode into; reused when its shape matches
+        Returns:
+            Tuple of (frame_number, frame), frame is None at end of video
+        """
+        while frame_number % self.frame_step:
+            if not cap.grab():
+                return frame_number, None
+            frame_number += 1
+            
+        if not cap.grab():
+            return frame_number, None
+        ret, frame = cap.retrieve(buffer)
+        return frame_number, frame if ret else None
+    
+    async def _decode_loop(self, cap: cv2.VideoCapture, queue: asyncio.Queue, stop: asyncio.Event):
+        """Decode frames off the event loop and feed them to the queue"""
+        loop = asyncio.get_running_loop()
+        frame_number = 0
+        # Ring must outlast the queue plus the frame being consumed and
+        # the frame being decoded
+        ring = [None] * (self.FRAME_QUEUE_SIZE + 2) if self.reuse_buffers else None
+        slot = 0
+        try:
+            while not stop.is_set():
+                buffer = ring[slot] if ring else None
+                frame_number, frame = await loop.run_in_executor(
+                    None, self._read_sampled, cap, frame_number, buffer
+                )
+                if frame is None:
                     break
+                if ring:
+                    ring[slot] = frame
+                    slot = (slot + 1) % len(ring)
+                await queue.put((frame_number, frame))
+                frame_number += 1
+        finally:
+            # End-of-stream marker, unless the consumer already left
+            if not stop.is_set():
+                await queue.put(None)
+    
+    async def _extract_frames_pyav(self, video_path: str, detect_scenes: Optional[bool] = None
+                                   ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Extract ALL frames using PyAV (FFmpeg bindings).
+        Frame times come from packet timestamps rather than frame_number / fps,
+        so variable frame rate sources get accurate timestamps.
+        Args:
+            video_path: Path to video file
+        Yields:
+            Dict containing frame data and metadata
+        """
+        import av  # Optional dependency, only needed for this backend
+        
+        container, on_gpu = self._open_pyav(av, video_path)
+            
+        try:
+            stream = container.streams.video[0]
+            if not on_gpu:
+                # Slice threading with automatic thread count
+                stream.thread_type = "SLICE"
+                stream.thread_count = 0
+            
+            # Get video properties
+            fps = float(stream.average_rate or 30)
+            frame_count = stream.frames
+            if stream.duration is not None:
+                duration = float(stream.duration * stream.time_base)
+            else:
+                duration = container.duration / av.time_base
+            
+            # Log video stats
+            self.logger.info(f"Processing video (pyav{', nvdec' if on_gpu else ''}): {fps} fps, {frame_count} frames, {duration:.2f} seconds")
+            
+            # Detect scenes for metadata
+            scenes = await self._frame_scenes(video_path, duration, detect_scenes)
+            scene_starts = [start for start, _ in scenes]
+            
+            # Decode every frame_step-th frame off the event loop
+            loop = asyncio.get_running_loop()
+            decoded = self._decode_pyav(container, stream)
+            pending = None
+            try:
+                while True:
+                    # Shielded so a cancelled consumer leaves the future
+                    # tracking the worker thread, which the finally waits on
+                    pending = loop.run_in_executor(None, next, decoded, None)
+                    item = await asyncio.shield(pending)
+                    if item is None:
+                        break
+                    frame_number, pts, frame = item
                     
-                # Get current frame time
-                frame_time = frame_number / fps
+                    # Get current frame time and scene
+                    if pts is not None:
+                        frame_time = float(pts * stream.time_base)
+                    else:
+                        frame_time = frame_number / fps
+                    scene_id = self._scene_index(scene_starts, frame_time)
+                    
+                    yield {
+                        'frame': frame,
+                        'metadata': self._frame_metadata(
+                            frame, frame_time, frame_number, fps, scenes, scene_id
+                        )
+                    }
+            finally:
+                # Let an in-flight next() return before closing the decoder
+                # and container out from under it
+                if pending is not None and not pending.done():
+                    await asyncio.wait([pending])
+                decoded.close()
+                        
+        finally:
+            container.close()
+    
+    def _decode_pyav(self, container, stream) -> Generator[tuple, None, None]:
+        """
+        Blocking PyAV decode of every frame_step-th frame.
+        Skipped frames are never converted to BGR.
+        Yields:
+            Tuple of (frame_number, pts, frame)
+        """
+        frame_number = 0
+        for packet in container.demux(stream):
+            for av_frame in packet.decode():
+                if frame_number % self.frame_step == 0:
+                    yield frame_number, av_frame.pts, av_frame.to_ndarray(format='bgr24')
+                frame_number += 1
+    
+    def _open_pyav(self, av, video_path: str) -> tuple:
+        """
+        Open a PyAV container, decoding with NVDEC when hwaccel is enabled.
+        Falls back to CPU decoding if the CUDA device cannot be initialized.
+        Returns:
+            Tuple of (container, on_gpu)
+        """
+        if self.hwaccel:
+            try:
+                from av.codec.hwaccel import HWAccel  # PyAV >= 14
+                hwaccel = HWAccel(device_type='cuda', allow_software_fallback=True)
+                return av.open(video_path, hwaccel=hwaccel), True
+            except (ImportError, RuntimeError, av.error.FFmpegError) as e:
+                self.logger.warning(f"NVDEC unavailable, decoding on CPU: {e}")
+        
+        try:
+            return av.open(video_path), False
+        except av.error.FFmpegError as e:
+            raise ValueError(f"Failed to open video: {video_path}") from e
+    
+    async def _extract_frames_decord(self, video_path: str, detect_scenes: Optional[bool] = None
+                                     ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Extract every frame_step-th frame using decord batched reads.
+        All sample indices are known upfront, so frames are fetched
+        FRAME_QUEUE_SIZE at a time with get_batch, which reuses decoder
+        state across the batch instead of decoding frame by frame.
+        Args:
+            video_path: Path to video file
+        Yields:
+            Dict containing frame data and metadata
+        """
+        from decord import VideoReader, cpu  # Optional dependency, only needed for this backend
+        
+        try:
+            reader = VideoReader(video_path, ctx=cpu(0), num_threads=4)
+        except Exception as e:
+            raise ValueError(f"Failed to open video: {video_path}") from e
+        
+        # Get video properties
+        fps = reader.get_avg_fps()
+        frame_count = len(reader)
+        duration = frame_count / fps
+        
+        # Log video stats
+        self.logger.info(f"Processing video (decord): {fps} fps, {frame_count} frames, {duration:.2f} seconds")
+        
+        # Detect scenes for metadata
+        scenes = await self._frame_scenes(video_path, duration, detect_scenes)
+        scene_starts = [start for start, _ in scenes]
+        
+        # Read sampled frames in batches off the event loop
+        loop = asyncio.get_running_loop()
+        indices = list(range(0, frame_count, self.frame_step))
+        for start in range(0, len(indices), self.FRAME_QUEUE_SIZE):
+            batch_indices = indices[start:start + self.FRAME_QUEUE_SIZE]
+            batch = await loop.run_in_executor(
+                None, lambda: reader.get_batch(batch_indices).asnumpy()
+            )
+            
+            for frame_number, rgb_frame in zip(batch_indices, batch):
+                # decord returns RGB; keep BGR like the other backends
+                frame = cv2.cvtColor(rgb_frame, cv2.COLOR_RGB2BGR)
                 
-                # Update current scene if needed
-                while frame_time >= next_scene_start and current_scene < len(scenes) - 1:
-                    current_scene += 1
-                    next_scene_start = scenes[current_scene + 1][0] if current_scene < len(scenes) - 1 else duration
+                # Get current frame time and scene
+                frame_time = frame_number / fps
+                scene_id = self._scene_index(scene_starts, frame_time)
                 
-                # Extract frame metadata
-                scene_start, scene_end = scenes[current_scene]
-                metadata = {
-                    'timestamp': frame_time,
-                    'frame_number': frame_number,
-                    'scene_id': current_scene,
-                    'frame_type': 'scene_change' if abs(frame_time - scene_start) < 1/fps else 'content',
-                    'resolution': (frame.shape[1], frame.shape[0]),
-                    'scene_progress': (frame_time - scene_start) / (scene_end - scene_start)
+                yield {
+                    'frame': frame,
+                    'metadata': self._frame_metadata(
+                        frame, frame_time, frame_number, fps, scenes, scene_id
+                    )
                 }
+    
+    async def _extract_frames_ffmpeg(self, video_path: str, detect_scenes: Optional[bool] = None
+                                     ) -> AsyncGenerator[Dict[str, Any], None]:
+        """
+        Extract every frame_step-th frame from an ffmpeg subprocess.
+        ffmpeg decodes (and drops skipped frames) in its own process and
+        writes raw BGR frames to a pipe, which is read without blocking the
+        event loop. Autorotation is disabled so frames match the probed size.
+        Args:
+            video_path: Path to video file
+        Yields:
+            Dict containing frame data and metadata
+        """
+        # Get video properties
+        cap = cv2.VideoCapture(video_path)
+        if not cap.isOpened():
+            raise ValueError(f"Failed to open video: {video_path}")
+        fps = cap.get(cv2.CAP_PROP_FPS)
+        frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+        cap.release()
+        duration = frame_count / fps
+        
+        # Log video stats
+        self.logger.info(f"Processing video (ffmpeg): {fps} fps, {frame_count} frames, {duration:.2f} seconds")
+        
+        # Detect scenes for metadata
+        scenes = await self._frame_scenes(video_path, duration, detect_scenes)
+        scene_starts = [start for start, _ in scenes]
+        
+        args = ['ffmpeg', '-v', 'error', '-noautorotate', '-i', video_path]
+        if self.frame_step > 1:
+            args += ['-vf', f"select=not(mod(n\\,{self.frame_step}))", '-vsync', '0']
+        args += ['-f', 'rawvideo', '-pix_fmt', 'bgr24', '-']
+        
+        proc = await asyncio.create_subprocess_exec(
+            *args, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.DEVNULL
+        )
+        frame_size = width * height * 3
+        
+        try:
+            index = 0
+            while True:
+                try:
+                    raw = await proc.stdout.readexactly(frame_size)
+                except asyncio.IncompleteReadError:
+                    break
+                frame = np.frombuffer(raw, dtype=np.uint8).reshape(height, width, 3)
+                frame_number = index * self.frame_step
+                
+                # Get current frame time and scene
+                frame_time = frame_number / fps
+                scene_id = self._scene_index(scene_starts, frame_time)
                 
                 yield {
                     'frame': frame,
-                    'metadata': metadata
+                    'metadata': self._frame_metadata(
+                        frame, frame_time, frame_number, fps, scenes, scene_id
+                    )
                 }
+                index += 1
                 
-                frame_number += 1
-                
-                # Allow other tasks to run every 10 frames
-                if frame_number % 10 == 0:
-                    await asyncio.sleep(0)
-                    
+            if await proc.wait() != 0:
+                raise ValueError(f"ffmpeg failed to decode video: {video_path}")
         finally:
-            cap.release()
+            if proc.returncode is None:
+                proc.kill()
+                await proc.wait()
     
     @staticmethod
-    def frame_to_bytes(frame: np.ndarray, quality: int = 90) -> bytes:
+    def frame_to_bytes(frame: np.ndarray, quality: int = 90, max_dim: Optional[int] = 1280) -> bytes:
         """
         Convert frame to compressed JPEG bytes for cloud storage.
+        Encodes with TurboJPEG when available, otherwise cv2.imencode.
         Args:
             frame: NumPy array containing frame data
             quality: JPEG compression quality (1-100)
+            max_dim: Downscale so the longest side is at most this many pixels
+                (Rekognition resizes larger images itself); None keeps full size
         Returns:
             Compressed frame as bytes
         """
+        if max_dim:
+            h, w = frame.shape[:2]
+            scale = max_dim / max(h, w)
+            if scale < 1.0:
+                frame = cv2.resize(frame, (int(w * scale), int(h * scale)),
+                                   interpolation=cv2.INTER_AREA)
+        
+        turbojpeg = _get_turbojpeg()
+        if turbojpeg is not None:
+            from turbojpeg import TJPF_BGR
+            return turbojpeg.encode(frame, quality=quality, pixel_format=TJPF_BGR)
+        
         success, buffer = cv2.imencode('.jpg', frame, [cv2.IMWRITE_JPEG_QUALITY, quality])
         if not success:
             raise ValueError("Failed to encode frame")
-        return buffer.tobytes() 
\ No newline at end of file
+        return buffer.tobytes()
+    
+    @classmethod
+    def encode_batch(cls, frames: List[np.ndarray], quality: int = 90,
+                     workers: Optional[int] = None) -> List[bytes]:
+        """
+        Convert a batch of frames to JPEG bytes in parallel.
+        cv2.imencode releases the GIL, so threads scale across cores
+        without pickling frames to worker processes.
+        Args:
+            frames: NumPy arrays containing frame data
+            quality: JPEG compression quality (1-100)
+            workers: Thread count, defaults to the number of CPUs
+        Returns:
+            Compressed frames as bytes, in input order
+        """
+        if not frames:
+            return []
+        max_workers = min(workers or os.cpu_count() or 1, len(frames))
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return list(executor.map(lambda frame: cls.frame_to_bytes(frame, quality), frames))
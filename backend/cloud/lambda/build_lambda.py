@@ -66,9 +66,12 @@ class LambdaBuilder:
             '-r', 'requirements.txt',
             '-t', str(python_dir),
             '--platform', 'manylinux2014_x86_64',
-            '--only-binary=:all:'
+            '--only-binary=:all:',
+            '--no-compile'  # Lambda compiles modules on first import
         ], check=True)
         
+        self.strip_layer(python_dir)
+        
         # Create layer ZIP
         layer_zip = self.build_dir / 'layer.zip'
         shutil.make_archive(
@@ -79,6 +82,27 @@ class LambdaBuilder:
         
         return layer_zip
         
+    def strip_layer(self, python_dir: Path):
+        """Remove files not needed at runtime to cut layer size and cold start"""
+        logger.info("Stripping Lambda layer...")
+        
+        # Bundled test suites and bytecode caches
+        for pattern in ('tests', 'test', '__pycache__'):
+            for path in list(python_dir.rglob(pattern)):
+                if path.is_dir():
+                    shutil.rmtree(path, ignore_errors=True)
+                    
+        # Install records are only used by pip
+        for record in python_dir.glob('*.dist-info/RECORD'):
+            record.unlink()
+            
+        # Debug symbols in compiled extensions
+        if shutil.which('strip'):
+            for so_file in python_dir.rglob('*.so*'):
+                subprocess.run(['strip', '--strip-unneeded', str(so_file)], check=False)
+        else:
+            logger.warning("strip not found, shared libraries left unstripped")
+        
     def package_function(self):
         """Package Lambda function code"""
         logger.info("Packaging Lambda function...")
@@ -1,41 +1,82 @@
 """
 AWS Lambda function for processing video frames with Rekognition.
 Processes frames uploaded to S3 and stores results.
+
+Each batch is a JSON manifest (the triggering key) pointing at a .bin
+object of concatenated JPEG frames, with per-frame offset/length/metadata.
+
+Batches arrive either as a direct invoke carrying an S3 event, or through
+the S3 -> SQS fan-out queue (see trigger_config.setup_sqs_fanout), where
+each SQS message body is the S3 event. A direct invoke carrying a
+manifest_key instead lists all of a video's batches, which are then
+processed within that one invocation.
 """
 
 import json
+import asyncio
+import gzip
+import aioboto3
 import boto3
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
+import io
 import os
 import logging
-from typing import Dict, Any
+from typing import Dict, Any, List
 import urllib.parse
 
+# Maximum frames analyzed concurrently (bounded by Rekognition TPS)
+FRAME_CONCURRENCY = int(os.environ.get('FRAME_CONCURRENCY', '20'))
+
+# Batches processed concurrently for a video manifest; each batch still
+# runs up to FRAME_CONCURRENCY frames
+MANIFEST_BATCH_CONCURRENCY = int(os.environ.get('MANIFEST_BATCH_CONCURRENCY', '2'))
+
+# Shared client config: keep connections alive across warm invocations and
+# size the pool for three concurrent Rekognition calls per in-flight frame
+CLIENT_CONFIG = Config(
+    max_pool_connections=max(50, FRAME_CONCURRENCY * 3),
+    tcp_keepalive=True,
+    retries={'max_attempts': 3, 'mode': 'adaptive'}
+)
+
 # Initialize AWS clients
-s3 = boto3.client('s3')
-rekognition = boto3.client('rekognition')
+s3 = boto3.client('s3', config=CLIENT_CONFIG)
+session = aioboto3.Session()
 logger = logging.getLogger()
 logger.setLevel(logging.INFO)
 
-def process_frame(frame_bytes: bytes) -> Dict[str, Any]:
-    """Process a single frame with Rekognition"""
+# Results above 8 MB are uploaded as parallel multipart parts
+TRANSFER_CONFIG = TransferConfig(
+    multipart_threshold=8 * 1024 * 1024,
+    max_concurrency=4,
+    use_threads=True
+)
+
+async def process_frame(rekognition, frame_bytes: bytes) -> Dict[str, Any]:
+    """Process a single frame with Rekognition, running all detections concurrently"""
     try:
-        # Detect labels
-        label_response = rekognition.detect_labels(
-            Image={'Bytes': frame_bytes},
-            MaxLabels=10,
-            MinConfidence=70
-        )
-        
-        # Detect faces
-        face_response = rekognition.detect_faces(
-            Image={'Bytes': frame_bytes},
-            Attributes=['ALL']
-        )
-        
-        # Detect text
-        text_response = rekognition.detect_text(
-            Image={'Bytes': frame_bytes}
-        )
+        try:
+            async with asyncio.TaskGroup() as group:
+                # Detect labels
+                labels = group.create_task(rekognition.detect_labels(
+                    Image={'Bytes': frame_bytes},
+                    MaxLabels=10,
+                    MinConfidence=70
+                ))
+                # Detect faces
+                faces = group.create_task(rekognition.detect_faces(
+                    Image={'Bytes': frame_bytes},
+                    Attributes=['ALL']
+                ))
+                # Detect text
+                texts = group.create_task(rekognition.detect_text(
+                    Image={'Bytes': frame_bytes}
+                ))
+        except ExceptionGroup as e:
+            # Siblings are already cancelled; surface the first failure
+            raise e.exceptions[0] from None
+        label_response, face_response, text_response = labels.result(), faces.result(), texts.result()
         
         return {
             'labels': label_response['Labels'],
@@ -46,55 +87,160 @@ def process_frame(frame_bytes: bytes) -> Dict[str, Any]:
         logger.error(f"Frame processing error: {str(e)}")
         raise
 
+def read_exact(body, length: int) -> bytes:
+    """Read exactly length bytes from a stream, across short reads"""
+    chunks = []
+    remaining = length
+    while remaining > 0:
+        chunk = body.read(remaining)
+        if not chunk:
+            raise ValueError(f"Frame data ended {remaining} bytes short of {length}")
+        chunks.append(chunk)
+        remaining -= len(chunk)
+    return b''.join(chunks)
+
+async def process_batch(manifest: Dict[str, Any], frames_body) -> List[Dict[str, Any]]:
+    """
+    Process all frames of a batch, at most FRAME_CONCURRENCY at a time.
+    Frames are read from the S3 body stream in manifest order as slots
+    free up, so only in-flight frames are held in memory.
+    """
+    semaphore = asyncio.Semaphore(FRAME_CONCURRENCY)
+    
+    async with session.client('rekognition', config=CLIENT_CONFIG) as rekognition:
+        async def process_entry(entry: Dict[str, Any], frame_bytes: bytes) -> Dict[str, Any]:
+            try:
+                # Process frame with Rekognition
+                frame_results = await process_frame(rekognition, frame_bytes)
+            finally:
+                semaphore.release()
+            
+            # Add metadata
+            return {
+                'timestamp': entry['metadata']['timestamp'],
+                'scene_id': entry['metadata']['scene_id'],
+                'results': frame_results
+            }
+        
+        # A TaskGroup cancels the remaining frames on the first failure, so
+        # no task outlives the Rekognition client
+        tasks = []
+        position = 0
+        try:
+            async with asyncio.TaskGroup() as group:
+                for entry in manifest['frames']:
+                    # Frames are stored back to back, so the next read is this
+                    # frame; check the manifest agrees before reading
+                    if entry['offset'] != position:
+                        raise ValueError(f"Frame offset {entry['offset']} does not follow position {position}")
+                    await semaphore.acquire()
+                    frame_bytes = await asyncio.to_thread(read_exact, frames_body, entry['length'])
+                    position += entry['length']
+                    tasks.append(group.create_task(process_entry(entry, frame_bytes)))
+        except ExceptionGroup as e:
+            raise e.exceptions[0] from None
+        
+        return [task.result() for task in tasks]
+
+def s3_object(event: Dict[str, Any]) -> tuple:
+    """Bucket and key of the triggering object, for direct S3 or SQS-wrapped events"""
+    record = event['Records'][0]
+    if record.get('eventSource') == 'aws:sqs':
+        record = json.loads(record['body'])['Records'][0]
+    bucket = record['s3']['bucket']['name']
+    key = urllib.parse.unquote_plus(record['s3']['object']['key'])
+    return bucket, key
+
+def store_results(bucket: str, result_key: str, results: Any):
+    """Store results in S3 (multipart with parallel parts for large results)"""
+    s3.upload_fileobj(
+        io.BytesIO(json.dumps(results).encode()),
+        bucket,
+        result_key,
+        ExtraArgs={'ContentType': 'application/json'},
+        Config=TRANSFER_CONFIG
+    )
+
+async def process_batch_key(bucket: str, key: str) -> tuple:
+    """Process one batch manifest and store its results; returns (result_key, frame count)"""
+    # Get batch manifest, then stream the concatenated JPEG frames it describes
+    response = await asyncio.to_thread(s3.get_object, Bucket=bucket, Key=key)
+    body = await asyncio.to_thread(response['Body'].read)
+    if response.get('ContentEncoding') == 'gzip':
+        body = gzip.decompress(body)
+    manifest = json.loads(body)
+    response = await asyncio.to_thread(s3.get_object, Bucket=bucket, Key=manifest['frames_key'])
+    
+    # Process frames concurrently
+    try:
+        results = await process_batch(manifest, response['Body'])
+    finally:
+        response['Body'].close()
+    
+    # Store results in S3
+    result_key = key.replace('frames/', 'results/')
+    await asyncio.to_thread(store_results, bucket, result_key, results)
+    return result_key, len(results)
+
+async def process_video_manifest(bucket: str, manifest_key: str) -> List[tuple]:
+    """
+    Process every batch listed in a video manifest within this invocation,
+    at most MANIFEST_BATCH_CONCURRENCY batches at a time.
+    """
+    response = await asyncio.to_thread(s3.get_object, Bucket=bucket, Key=manifest_key)
+    manifest = json.loads(await asyncio.to_thread(response['Body'].read))
+    semaphore = asyncio.Semaphore(MANIFEST_BATCH_CONCURRENCY)
+    
+    async def process_listed(batch_key: str) -> tuple:
+        async with semaphore:
+            return await process_batch_key(bucket, batch_key)
+    
+    try:
+        async with asyncio.TaskGroup() as group:
+            tasks = [group.create_task(process_listed(batch_key))
+                     for batch_key in manifest['batch_keys']]
+    except ExceptionGroup as e:
+        raise e.exceptions[0] from None
+    
+    return [task.result() for task in tasks]
+
 def handler(event: Dict[str, Any], context: Any) -> Dict[str, Any]:
     """Lambda handler for processing frames"""
     try:
+        # A video manifest lists every batch; process them all here
+        if 'manifest_key' in event:
+            processed = asyncio.run(process_video_manifest(event['bucket'], event['manifest_key']))
+            frame_count = sum(count for _, count in processed)
+            logger.info(f"Successfully processed {frame_count} frames in {len(processed)} batches")
+            return {
+                'statusCode': 200,
+                'body': json.dumps({
+                    'message': f'Processed {frame_count} frames in {len(processed)} batches',
+                    'result_keys': [result_key for result_key, _ in processed]
+                })
+            }
+        
         # Get bucket and key from event
-        bucket = event['Records'][0]['s3']['bucket']['name']
-        key = urllib.parse.unquote_plus(event['Records'][0]['s3']['object']['key'])
+        bucket, key = s3_object(event)
         
         logger.info(f"Processing frames from s3://{bucket}/{key}")
+        result_key, frame_count = asyncio.run(process_batch_key(bucket, key))
         
-        # Get frames batch from S3
-        response = s3.get_object(Bucket=bucket, Key=key)
-        frames_batch = json.loads(response['Body'].read())
-        
-        # Process each frame
-        results = []
-        for frame_data in frames_batch:
-            # Convert frame back to bytes
-            frame_bytes = frame_data['frame'].encode('latin1')
-            
-            # Process frame with Rekognition
-            frame_results = process_frame(frame_bytes)
-            
-            # Add metadata
-            results.append({
-                'timestamp': frame_data['metadata']['timestamp'],
-                'scene_id': frame_data['metadata']['scene_id'],
-                'results': frame_results
-            })
-        
-        # Store results in S3
-        result_key = key.replace('frames/', 'results/')
-        s3.put_object(
-            Bucket=bucket,
-            Key=result_key,
-            Body=json.dumps(results),
-            ContentType='application/json'
-        )
-        
-        logger.info(f"Successfully processed {len(results)} frames")
+        logger.info(f"Successfully processed {frame_count} frames")
         return {
             'statusCode': 200,
             'body': json.dumps({
-                'message': f'Processed {len(results)} frames',
+                'message': f'Processed {frame_count} frames',
                 'result_key': result_key
             })
         }
         
     except Exception as e:
         logger.error(f"Processing failed: {str(e)}")
+        # A returned error counts as success for an SQS event source and the
+        # message would be deleted; raise so SQS redelivers the batch
+        if (event.get('Records') or [{}])[0].get('eventSource') == 'aws:sqs':
+            raise
         return {
             'statusCode': 500,
             'body': json.dumps({
@@ -26,6 +26,16 @@ from botocore.exceptions import ClientError
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Notify on batch manifests only; the .bin frame blob is uploaded first
+BATCH_MANIFEST_FILTER = {
+    'Key': {
+        'FilterRules': [
+            {'Name': 'prefix', 'Value': 'frames/'},
+            {'Name': 'suffix', 'Value': '.json'}
+        ]
+    }
+}
+
 class TriggerConfigurator:
     """Handles S3 trigger setup for Lambda function"""
     
@@ -36,6 +46,7 @@ class TriggerConfigurator:
         self.s3_client = boto3.client('s3')
         self.lambda_client = boto3.client('lambda')
         self.iam_client = boto3.client('iam')
+        self.sqs_client = boto3.client('sqs')
         
     def setup_bucket_notification(self):
         """Configure S3 bucket to trigger Lambda"""
@@ -56,16 +67,7 @@ class TriggerConfigurator:
                         {
                             'LambdaFunctionArn': function_arn,
                             'Events': ['s3:ObjectCreated:*'],
-                            'Filter': {
-                                'Key': {
-                                    'FilterRules': [
-                                        {
-                                            'Name': 'suffix',
-                                            'Value': '.jpg'  # Only trigger on frame images
-                                        }
-                                    ]
-                                }
-                            }
+                            'Filter': BATCH_MANIFEST_FILTER
                         }
                     ]
                 }
@@ -87,6 +89,77 @@ class TriggerConfigurator:
             logger.error(f"Failed to set up S3 trigger: {e}")
             raise
             
+    def setup_sqs_fanout(self, queue_name='video-frame-batches'):
+        """
+        Route batch manifest uploads through SQS to Lambda.
+        The upload itself triggers processing, so CloudProcessingManager can
+        run with LAMBDA_TRIGGER=s3_event and skip per-batch invoke calls.
+        """
+        logger.info(f"Setting up S3 -> SQS -> Lambda fan-out via {queue_name}")
+        
+        try:
+            # Visibility timeout must exceed the function timeout (300s)
+            queue_url = self.sqs_client.create_queue(
+                QueueName=queue_name,
+                Attributes={'VisibilityTimeout': '1800'}
+            )['QueueUrl']
+            queue_arn = self.sqs_client.get_queue_attributes(
+                QueueUrl=queue_url,
+                AttributeNames=['QueueArn']
+            )['Attributes']['QueueArn']
+            
+            # Allow the bucket to publish to the queue
+            self.sqs_client.set_queue_attributes(
+                QueueUrl=queue_url,
+                Attributes={'Policy': json.dumps({
+                    'Version': '2012-10-17',
+                    'Statement': [{
+                        'Effect': 'Allow',
+                        'Principal': {'Service': 's3.amazonaws.com'},
+                        'Action': 'sqs:SendMessage',
+                        'Resource': queue_arn,
+                        'Condition': {
+                            'ArnEquals': {'aws:SourceArn': f'arn:aws:s3:::{self.bucket_name}'}
+                        }
+                    }]
+                })}
+            )
+            
+            # put_bucket_notification_configuration replaces the whole config,
+            # so merge the queue route into the existing notifications
+            notification = self.s3_client.get_bucket_notification_configuration(
+                Bucket=self.bucket_name
+            )
+            notification.pop('ResponseMetadata', None)
+            queue_configs = [
+                config for config in notification.get('QueueConfigurations', [])
+                if config.get('QueueArn') != queue_arn
+            ]
+            queue_configs.append({
+                'QueueArn': queue_arn,
+                'Events': ['s3:ObjectCreated:*'],
+                'Filter': BATCH_MANIFEST_FILTER
+            })
+            notification['QueueConfigurations'] = queue_configs
+            self.s3_client.put_bucket_notification_configuration(
+                Bucket=self.bucket_name,
+                NotificationConfiguration=notification
+            )
+            
+            # One batch per invocation, matching the direct invoke path
+            self.lambda_client.create_event_source_mapping(
+                EventSourceArn=queue_arn,
+                FunctionName=self.function_name,
+                BatchSize=1
+            )
+            
+            logger.info("SQS fan-out configured successfully")
+            return queue_arn
+            
+        except ClientError as e:
+            logger.error(f"Failed to set up SQS fan-out: {e}")
+            raise
+            
     def validate_configuration(self):
         """Validate trigger configuration"""
         try:
@@ -101,7 +174,19 @@ class TriggerConfigurator:
                 for config in response.get('LambdaFunctionConfigurations', [])
             )
             
-            if not has_lambda_config:
+            # Or a queue route: the bucket notifies a queue this function consumes
+            queue_arns = {
+                config.get('QueueArn')
+                for config in response.get('QueueConfigurations', [])
+            }
+            has_queue_route = bool(queue_arns) and any(
+                mapping.get('EventSourceArn') in queue_arns
+                for mapping in self.lambda_client.list_event_source_mappings(
+                    FunctionName=self.function_name
+                ).get('EventSourceMappings', [])
+            )
+            
+            if not (has_lambda_config or has_queue_route):
                 logger.warning("Lambda trigger not found in bucket configuration")
                 return False
                 
@@ -20,21 +20,39 @@ Date: 2024
 """
 
 import os
-import boto3
-import json
+import aioboto3
+import gzip
+import io
+import orjson
+import random
 import time
 from pathlib import Path
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, AsyncIterator, AsyncIterable
 from dotenv import load_dotenv
 from frame_extractor import FrameExtractor
 import asyncio
+import atexit
 import logging
+import queue
 import uuid
 import structlog
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import AsyncExitStack, suppress
 from datetime import datetime, timedelta
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
+from boto3.s3.transfer import TransferConfig
+from botocore.config import Config
 from botocore.exceptions import ClientError
 import cv2
-from collections import defaultdict
+from collections import Counter, deque
+
+# Use libuv's event loop for the many concurrent uploads when available
+try:
+    import uvloop
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+except ImportError:
+    pass
 
 # Ensure logs directory exists
 os.makedirs('logs', exist_ok=True)
@@ -46,7 +64,9 @@ structlog.configure(
         structlog.stdlib.add_log_level,
         structlog.processors.StackInfoRenderer(),
         structlog.processors.format_exc_info,
-        structlog.processors.JSONRenderer()
+        structlog.processors.JSONRenderer(
+            serializer=lambda event, **kw: orjson.dumps(event, **kw).decode()
+        )
     ]
 )
 
@@ -55,26 +75,41 @@ processing_handler = logging.FileHandler('logs/processing.log')
 processing_handler.setFormatter(
     logging.Formatter('%(asctime)s [%(levelname)s] %(message)s')
 )
-processing_logger = logging.getLogger('processing')
-processing_logger.addHandler(processing_handler)
-processing_logger.setLevel(logging.INFO)
+processing_handler.addFilter(logging.Filter('processing'))
 
 # Performance metrics logger
 performance_handler = logging.FileHandler('logs/performance.log')
 performance_handler.setFormatter(
     logging.Formatter('%(asctime)s [%(levelname)s] %(message)s')
 )
-performance_logger = logging.getLogger('performance')
-performance_logger.addHandler(performance_handler)
-performance_logger.setLevel(logging.INFO)
+performance_handler.addFilter(logging.Filter('performance'))
 
 # Error logger with detailed formatting
 error_handler = logging.FileHandler('logs/error.log')
 error_handler.setFormatter(
     logging.Formatter('%(asctime)s [%(levelname)s] [%(name)s] %(message)s\nStack: %(stack_info)s')
 )
+error_handler.setLevel(logging.ERROR)
+error_handler.addFilter(logging.Filter('error'))
+
+# Loggers only enqueue records; one listener thread does the file writes so
+# logging never blocks the event loop. Name filters route each record to its file.
+log_queue = queue.Queue(-1)
+log_listener = QueueListener(log_queue, processing_handler, performance_handler, error_handler,
+                             respect_handler_level=True)
+log_listener.start()
+atexit.register(log_listener.stop)
+
+processing_logger = logging.getLogger('processing')
+processing_logger.addHandler(QueueHandler(log_queue))
+processing_logger.setLevel(logging.INFO)
+
+performance_logger = logging.getLogger('performance')
+performance_logger.addHandler(QueueHandler(log_queue))
+performance_logger.setLevel(logging.INFO)
+
 error_logger = logging.getLogger('error')
-error_logger.addHandler(error_handler)
+error_logger.addHandler(QueueHandler(log_queue))
 error_logger.setLevel(logging.ERROR)
 
 # Main logger now uses structured logging
@@ -83,11 +118,44 @@ logger = structlog.get_logger('main')
 # Load cloud configuration
 load_dotenv(Path(__file__).parent / 'config.env')
 
+_END = object()
+
+async def prefetch(items: AsyncIterable, n: int = 2) -> AsyncIterator:
+    """
+    Iterate an async iterable while a background task runs up to n items
+    ahead, so producing the next item overlaps with consuming this one.
+    Errors from the source are re-raised to the consumer.
+    """
+    queue = asyncio.Queue(maxsize=n)
+    
+    async def produce():
+        try:
+            async for item in items:
+                await queue.put(item)
+        except Exception:
+            await queue.put(_END)
+            raise
+        await queue.put(_END)
+    
+    producer = asyncio.create_task(produce())
+    try:
+        while (item := await queue.get()) is not _END:
+            yield item
+        await producer
+    finally:
+        if not producer.done():
+            producer.cancel()
+            with suppress(asyncio.CancelledError):
+                await producer
+
 class UsageTracker:
     """Tracks AWS service usage to stay within free tier limits"""
     
+    STATS_TTL = 1.0  # Seconds a get_usage_stats result is reused
+    RESET_CHECK_INTERVAL = 60.0  # Seconds between month-rollover checks
+    
     def __init__(self):
-        self.usage = defaultdict(int)
+        self.usage = Counter()
         self.limits = {
             'rekognition_images': 1000,  # Free tier: 1000 images/month
             's3_storage_mb': 5120,       # Free tier: 5GB
@@ -95,31 +163,76 @@ class UsageTracker:
             's3_gets': 20000             # Free tier: 20000 GET requests
         }
         self.last_reset = datetime.utcnow()
+        self._last_reset_month = self.last_reset.month
+        self._last_reset_check = time.monotonic()
+        # Cached get_usage_stats result; None after usage changes
+        self._stats_cache: Optional[Dict[str, Any]] = None
+        self._stats_cache_ts = 0.0
     
     def check_limits(self, service: str, amount: int = 1) -> bool:
         """Check if operation would exceed free tier limits"""
-        # Reset counters if it's a new month
-        if self.last_reset.month != datetime.utcnow().month:
-            self.usage = defaultdict(int)
-            self.last_reset = datetime.utcnow()
+        # Reset counters if it's a new month, checking at most once a minute
+        now = time.monotonic()
+        if now - self._last_reset_check > self.RESET_CHECK_INTERVAL:
+            self._last_reset_check = now
+            current = datetime.utcnow()
+            if current.month != self._last_reset_month:
+                self.usage.clear()
+                self.last_reset = current
+                self._last_reset_month = current.month
+                self._stats_cache = None
         
-        return self.usage[service] + amount <= self.limits.get(service, float('inf'))
+        return self.usage.get(service, 0) + amount <= self.limits.get(service, float('inf'))
     
     def record_usage(self, service: str, amount: int = 1):
         """Record usage of a service"""
         self.usage[service] += amount
+        self._stats_cache = None
         
     def get_usage_stats(self) -> Dict[str, Any]:
-        """Get current usage statistics"""
-        return {
+        """Get current usage statistics (cached briefly between usage changes)"""
+        now = time.monotonic()
+        if self._stats_cache is not None and now - self._stats_cache_ts < self.STATS_TTL:
+            return self._stats_cache
+        
+        self._stats_cache = {
             'usage': dict(self.usage),
             'limits': self.limits,
             'last_reset': self.last_reset.isoformat(),
             'usage_percentages': {
-                service: (self.usage[service] / limit) * 100
+                service: (self.usage.get(service, 0) / limit) * 100
                 for service, limit in self.limits.items()
             }
         }
+        self._stats_cache_ts = now
+        return self._stats_cache
+
+class TokenBucket:
+    """Async token bucket: bursts up to capacity, then refills at rate tokens/second"""
+    
+    def __init__(self, rate: float, capacity: float):
+        if rate <= 0 or capacity <= 0:
+            raise ValueError("Token bucket rate and capacity must be positive")
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self._lock = asyncio.Lock()
+    
+    async def acquire(self, amount: float = 1):
+        """Take tokens, waiting only while the bucket is empty"""
+        if amount > self.capacity:
+            # The bucket never holds this many tokens; waiting would hang
+            raise ValueError(f"Cannot acquire {amount} tokens from a bucket of capacity {self.capacity}")
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) / self.rate)
 
 class ProcessingError(Exception):
     """Custom exception for processing errors with detailed context"""
@@ -141,25 +254,27 @@ class CloudProcessingManager:
         self.bucket = os.getenv('S3_BUCKET', 'mam-video-processing')
         self.webhook_url = os.getenv('WEBHOOK_URL', 'http://localhost:5001/api/v1/webhooks/processing')
         
-        # Initialize AWS clients with error handling
-        try:
-            self.s3 = boto3.client('s3', region_name=self.region)
-            self.lambda_client = boto3.client('lambda', region_name=self.region)
-            
-            # Validate AWS credentials
-            self.s3.list_buckets()
-            self.logger.info("AWS clients initialized successfully", 
-                       region=self.region, 
-                       bucket=self.bucket)
-        except Exception as e:
-            self.logger.error("Failed to initialize AWS clients", 
-                        error=str(e), 
-                        region=self.region)
-            raise ProcessingError(
-                message="AWS initialization failed",
-                error_type="aws_init_error",
-                context={"region": self.region, "error": str(e)}
-            )
+        # Async AWS clients are opened on first use (see _ensure_clients)
+        self.session = aioboto3.Session(region_name=self.region)
+        self.s3 = None
+        self.lambda_client = None
+        self._client_stack: Optional[AsyncExitStack] = None
+        self._client_lock = asyncio.Lock()
+        self._credentials_validated = False
+        self._validate_lock = asyncio.Lock()
+        # Pool sized for concurrent batch uploads; keepalive avoids repeat TLS handshakes
+        self.client_config = Config(
+            max_pool_connections=64,
+            tcp_keepalive=True,
+            retries={'mode': 'adaptive', 'max_attempts': 10}
+        )
+        
+        # Frame blobs over 8 MB upload as parallel 16 MB multipart parts
+        self.transfer_config = TransferConfig(
+            multipart_threshold=8 * 1024 * 1024,
+            multipart_chunksize=16 * 1024 * 1024,
+            max_concurrency=10
+        )
         
         # Processing settings with validation
         try:
@@ -185,8 +300,17 @@ class CloudProcessingManager:
             )
         
         # Initialize components with error tracking
-        self.frame_extractor = FrameExtractor()  # No sample rate needed anymore
-        self.processing_errors: List[Dict[str, Any]] = []
+        # Frames are copied into chunk arrays as soon as they are yielded,
+        # so the extractor can decode into a reused buffer ring
+        self.frame_extractor = FrameExtractor(
+            backend=os.getenv('FRAME_BACKEND', 'opencv'),
+            reuse_buffers=True
+        )
+        # JPEG encoding pool, created on first use and released by close()
+        self._encode_pool = None
+        # Most recent errors only; error_count keeps the full total
+        self.processing_errors: deque = deque(maxlen=128)
+        self.error_count = 0
         self.processing_metrics: Dict[str, Any] = {
             "start_time": None,
             "frames_processed": 0,
@@ -198,20 +322,165 @@ class CloudProcessingManager:
         # Initialize usage tracker
         self.usage_tracker = UsageTracker()
         
-        # Rate limiting settings
-        self.rate_limit_delay = 0.1  # seconds between operations
-        self.last_operation_time = defaultdict(float)
+        # Static parts of the Lambda invoke payload, shared by every batch
+        self._payload_bucket = {'name': self.bucket}
+        self._callback_prefix = f"{self.webhook_url}?asset_id="
+        
+        # How batches reach Lambda: 'invoke' calls it per batch, 'manifest'
+        # invokes it once per video with a list of batches, 's3_event'
+        # relies on the bucket's S3 -> SQS -> Lambda fan-out
+        # (lambda/trigger_config.py setup_sqs_fanout)
+        self.trigger_mode = os.getenv('LAMBDA_TRIGGER', 'invoke')
+        
+        # Pipeline workers: concurrent batch uploads and Lambda invokes
+        self.upload_concurrency = max(1, int(os.getenv('S3_CONCURRENCY', 16)))
+        self.invoke_concurrency = max(1, int(os.getenv('LAMBDA_CONCURRENCY', 4)))
+        
+        # Frame chunks decoded ahead while the current chunk is encoded
+        self.frame_prefetch = max(1, int(os.getenv('FRAME_PREFETCH', 2)))
+        
+        # Per-batch success and progress lines are logged every Nth batch
+        self.log_every = max(1, int(os.getenv('LOG_EVERY', 10)))
+        
+        # Rate limiting: per-operation token buckets allow bursts, queuing
+        # only when the sustained request rate is exceeded
+        s3_put_rate = float(os.getenv('S3_PUT_RATE', 50))
+        invoke_rate = float(os.getenv('LAMBDA_INVOKE_RATE', 100))
+        self.rate_limits = {
+            # Each batch takes 2 PUTs (frames + manifest) in one acquire
+            's3_put': TokenBucket(rate=s3_put_rate, capacity=max(s3_put_rate, 2)),
+            'lambda_invoke': TokenBucket(rate=invoke_rate, capacity=invoke_rate)
+        }
         
         # Cleanup settings
         self.cleanup_delay = 300  # 5 minutes after processing
         self.cleanup_tasks = []
     
-    async def wait_for_rate_limit(self, operation: str):
-        """Enforce rate limiting between operations"""
-        elapsed = time.time() - self.last_operation_time[operation]
-        if elapsed < self.rate_limit_delay:
-            await asyncio.sleep(self.rate_limit_delay - elapsed)
-        self.last_operation_time[operation] = time.time()
+    async def _ensure_clients(self):
+        """Open the async S3 and Lambda clients once, shared by all operations"""
+        if self._client_stack is not None:
+            return
+        async with self._client_lock:
+            if self._client_stack is not None:
+                return
+            stack = AsyncExitStack()
+            try:
+                self.s3 = await stack.enter_async_context(
+                    self.session.client('s3', config=self.client_config)
+                )
+                self.lambda_client = await stack.enter_async_context(
+                    self.session.client('lambda', config=self.client_config)
+                )
+            except Exception:
+                await stack.aclose()
+                raise
+            self._client_stack = stack
+    
+    async def validate(self):
+        """
+        Validate AWS credentials and bucket access with a single HeadBucket.
+        Runs lazily before the first upload if not called at startup.
+        """
+        try:
+            await self._ensure_clients()
+            await self.s3.head_bucket(Bucket=self.bucket)
+            self._credentials_validated = True
+            self.logger.info("AWS clients initialized successfully", 
+                       region=self.region, 
+                       bucket=self.bucket)
+        except Exception as e:
+            self.logger.error("Failed to initialize AWS clients", 
+                        error=str(e), 
+                        region=self.region)
+            raise ProcessingError(
+                message="AWS initialization failed",
+                error_type="aws_init_error",
+                context={"region": self.region, "error": str(e)}
+            )
+    
+    async def _ensure_validated(self):
+        """Validate once; concurrent uploaders wait for the first validation"""
+        if self._credentials_validated:
+            return
+        async with self._validate_lock:
+            if not self._credentials_validated:
+                await self.validate()
+    
+    async def start(self):
+        """Open the AWS clients and validate access before processing"""
+        await self.validate()
+    
+    async def __aenter__(self):
+        await self.start()
+        return self
+    
+    async def __aexit__(self, exc_type, exc, tb):
+        await self.close()
+    
+    async def close(self):
+        """Close the async AWS clients and the encode pool; both reopen on next use"""
+        if self._encode_pool is not None:
+            pool, self._encode_pool = self._encode_pool, None
+            pool.shutdown(wait=False)
+        if self._client_stack is not None:
+            stack, self._client_stack = self._client_stack, None
+            await stack.aclose()
+            self.s3 = None
+            self.lambda_client = None
+        
+        # The shared instance's locks and clients belong to this event loop;
+        # drop it so the next get_processing_manager() starts fresh
+        if get_processing_manager.cache_info().currsize and get_processing_manager() is self:
+            get_processing_manager.cache_clear()
+    
+    def _get_encode_pool(self):
+        """
+        Pool that runs JPEG encoding off the event loop. Threads suffice since
+        cv2/TurboJPEG release the GIL; ENCODE_POOL=process uses worker
+        processes instead, at the cost of pickling each frame.
+        """
+        if self._encode_pool is None:
+            if os.getenv('ENCODE_POOL', 'thread') == 'process':
+                self._encode_pool = ProcessPoolExecutor(max_workers=os.cpu_count())
+            else:
+                self._encode_pool = ThreadPoolExecutor(max_workers=os.cpu_count())
+        return self._encode_pool
+    
+    def _record_error(self, error_type: str, details: Dict[str, Any], message: str):
+        """Count an error and keep it in the bounded recent-errors buffer"""
+        self.error_count += 1
+        self.processing_metrics['errors_count'] = self.error_count
+        self.processing_errors.append({
+            'timestamp': datetime.utcnow().isoformat(),
+            'type': error_type,
+            'details': details,
+            'message': message
+        })
+    
+    async def wait_for_rate_limit(self, operation: str, amount: int = 1):
+        """Wait for capacity in the operation's token bucket"""
+        bucket = self.rate_limits.get(operation)
+        if bucket is not None:
+            await bucket.acquire(amount)
+    
+    async def _list_objects(self, prefix: str) -> List[Dict[str, Any]]:
+        """List every object under a prefix, across all result pages"""
+        paginator = self.s3.get_paginator('list_objects_v2')
+        objects = []
+        async for page in paginator.paginate(Bucket=self.bucket, Prefix=prefix,
+                                             PaginationConfig={'PageSize': 1000}):
+            objects.extend(page.get('Contents', []))
+        return objects
+    
+    async def _delete_objects(self, keys: List[str]):
+        """Delete keys with DeleteObjects, up to 1000 keys per request"""
+        await asyncio.gather(*(
+            self.s3.delete_objects(
+                Bucket=self.bucket,
+                Delete={'Objects': [{'Key': key} for key in keys[i:i + 1000]], 'Quiet': True}
+            )
+            for i in range(0, len(keys), 1000)
+        ))
     
     async def cleanup_files(self, asset_id: str, delay: int = None):
         """Schedule cleanup of processed files"""
@@ -221,78 +490,128 @@ class CloudProcessingManager:
         await asyncio.sleep(delay)
         
         try:
+            await self._ensure_clients()
+            
             # Delete frame files
-            response = self.s3.list_objects_v2(
-                Bucket=self.bucket,
-                Prefix=f"frames/{asset_id}/"
-            )
-            for obj in response.get('Contents', []):
-                self.s3.delete_object(Bucket=self.bucket, Key=obj['Key'])
-                self.logger.info(f"Cleaned up frame file: {obj['Key']}")
+            frame_keys = [obj['Key'] for obj in await self._list_objects(f"frames/{asset_id}/")]
+            if self.trigger_mode == 'manifest':
+                frame_keys.append(f"manifests/{asset_id}.json")
+            await self._delete_objects(frame_keys)
+            self.logger.info("Cleaned up frame files", asset_id=asset_id, count=len(frame_keys))
             
-            # Keep only the latest result file
-            response = self.s3.list_objects_v2(
-                Bucket=self.bucket,
-                Prefix=f"results/{asset_id}/"
-            )
+            # Keep only the latest result file, across all pages
             objects = sorted(
-                response.get('Contents', []),
+                await self._list_objects(f"results/{asset_id}/"),
                 key=lambda x: x['LastModified'],
                 reverse=True
             )
             
             # Delete all but the latest result
-            for obj in objects[1:]:
-                self.s3.delete_object(Bucket=self.bucket, Key=obj['Key'])
-                self.logger.info(f"Cleaned up old result: {obj['Key']}")
+            result_keys = [obj['Key'] for obj in objects[1:]]
+            await self._delete_objects(result_keys)
+            self.logger.info("Cleaned up old results", asset_id=asset_id, count=len(result_keys))
                 
         except Exception as e:
             self.logger.error(f"Cleanup failed: {e}")
     
+    @staticmethod
+    def _pack_frames(frames: List[Dict]) -> tuple:
+        """
+        Concatenate a batch of JPEG frames into one binary blob.
+        Returns:
+            Tuple of (blob bytes, manifest entries with offset/length/metadata)
+        """
+        entries = []
+        offset = 0
+        for frame_data in frames:
+            length = len(frame_data['frame'])
+            entries.append({
+                'offset': offset,
+                'length': length,
+                'metadata': frame_data['metadata']
+            })
+            offset += length
+        return b''.join(frame_data['frame'] for frame_data in frames), entries
+    
     async def upload_frames_batch(self, frames: List[Dict], asset_id: str, batch_num: int) -> str:
-        """Upload a batch of frames to S3 with usage tracking"""
-        # Check S3 limits
-        batch_size_mb = len(json.dumps(frames).encode()) / 1024 / 1024
+        """
+        Upload a batch of frames to S3 with usage tracking.
+        Frames are stored as concatenated JPEGs (.bin) plus a small JSON
+        manifest with per-frame offsets and metadata.
+        Returns:
+            S3 key of the batch manifest
+        """
+        await self._ensure_validated()
+        
+        body, entries = self._pack_frames(frames)
+        
+        # Check S3 limits (frames blob + manifest)
+        batch_size_mb = len(body) / 1024 / 1024
         if not self.usage_tracker.check_limits('s3_storage_mb', int(batch_size_mb)):
             raise Exception("S3 storage limit reached")
-        if not self.usage_tracker.check_limits('s3_puts'):
+        if not self.usage_tracker.check_limits('s3_puts', 2):
             raise Exception("S3 PUT request limit reached")
             
         # Apply rate limiting
-        await self.wait_for_rate_limit('s3_put')
+        await self.wait_for_rate_limit('s3_put', 2)
         
-        # Create unique key for this batch
-        key = f"frames/{asset_id}/batch_{batch_num}_{int(time.time())}.json"
+        # Create unique keys for this batch, spread over 16 hex prefixes so
+        # S3 can partition request load
+        key_base = f"frames/{asset_id}/{random.randint(0, 15):x}/batch_{batch_num}_{uuid.uuid4().hex[:8]}"
+        frames_key = f"{key_base}.bin"
+        key = f"{key_base}.json"
         
         try:
             # Track upload start time
-            start_time = time.time()
+            blog = self.logger.bind(asset_id=asset_id, batch_num=batch_num)
+            start_ns = time.perf_counter_ns()
+            
+            metadata = {
+                'asset_id': asset_id,
+                'batch_number': str(batch_num),
+                'frame_count': str(len(frames))
+            }
             
-            # Upload frames batch to S3
-            self.s3.put_object(
+            await self._ensure_clients()
+            
+            # Upload raw JPEG frames, then the manifest that points at them
+            await self.s3.upload_fileobj(
+                io.BytesIO(body),
+                self.bucket,
+                frames_key,
+                ExtraArgs={
+                    'ContentType': 'application/octet-stream',
+                    'Metadata': metadata
+                },
+                Config=self.transfer_config
+            )
+            # The manifest's repeated metadata keys gzip well; the JPEG blob
+            # above is already compressed and is sent as-is
+            await self.s3.put_object(
                 Bucket=self.bucket,
                 Key=key,
-                Body=json.dumps(frames),
-                ContentType='application/json',
-                Metadata={
+                Body=gzip.compress(orjson.dumps({
                     'asset_id': asset_id,
-                    'batch_number': str(batch_num),
-                    'frame_count': str(len(frames))
-                }
+                    'batch_number': batch_num,
+                    'frames_key': frames_key,
+                    'frames': entries
+                }, option=orjson.OPT_SERIALIZE_NUMPY), compresslevel=3),
+                ContentType='application/json',
+                ContentEncoding='gzip',
+                Metadata=metadata
             )
             
             # Record usage
-            self.usage_tracker.record_usage('s3_puts')
+            self.usage_tracker.record_usage('s3_puts', 2)
             self.usage_tracker.record_usage('s3_storage_mb', int(batch_size_mb))
             
             # Track successful upload
-            upload_time = time.time() - start_time
-            self.logger.info("Batch upload successful",
-                       asset_id=asset_id,
-                       batch_num=batch_num,
-                       frame_count=len(frames),
-                       upload_time=f"{upload_time:.2f}s",
-                       s3_key=key)
+            upload_time_ms = (time.perf_counter_ns() - start_ns) / 1e6
+            if batch_num % self.log_every == 0:
+                blog.info("Batch upload successful",
+                           frame_count=len(frames),
+                           upload_time_ms=round(upload_time_ms, 1),
+                           s3_key=key)
             
             self.processing_metrics['batches_uploaded'] += 1
             self.processing_metrics['frames_processed'] += len(frames)
@@ -314,12 +633,7 @@ class CloudProcessingManager:
                         error_details=str(e),
                         **error_context)
             
-            self.processing_errors.append({
-                'timestamp': datetime.utcnow().isoformat(),
-                'type': 'upload_error',
-                'details': error_context,
-                'message': str(e)
-            })
+            self._record_error('upload_error', error_context, str(e))
             
             raise ProcessingError(
                 message=f"Failed to upload batch {batch_num}",
@@ -344,23 +658,26 @@ class CloudProcessingManager:
             Lambda response
         """
         try:
-            # Prepare Lambda payload
+            # Prepare Lambda payload; only the key and asset vary per batch
             payload = {
                 'Records': [{
                     's3': {
-                        'bucket': {'name': self.bucket},
+                        'bucket': self._payload_bucket,
                         'object': {'key': s3_key}
                     }
                 }],
                 'asset_id': asset_id,
-                'callback_url': f"{self.webhook_url}?asset_id={asset_id}"
+                'callback_url': self._callback_prefix + asset_id
             }
             
+            await self._ensure_clients()
+            await self.wait_for_rate_limit('lambda_invoke')
+            
             # Invoke Lambda asynchronously
-            response = self.lambda_client.invoke(
+            response = await self.lambda_client.invoke(
                 FunctionName='process-video-frames',
                 InvocationType='Event',  # Async invocation
-                Payload=json.dumps(payload)
+                Payload=orjson.dumps(payload)
             )
             
             return {
@@ -373,8 +690,98 @@ class CloudProcessingManager:
             self.logger.error(f"Failed to trigger Lambda: {e}")
             raise
     
+    async def trigger_manifest_processing(self, batch_keys: List[str], asset_id: str) -> Dict[str, Any]:
+        """
+        Trigger a single Lambda invocation for all of a video's batches
+        Args:
+            batch_keys: S3 keys of the uploaded batch manifests
+            asset_id: Asset identifier
+        Returns:
+            Lambda response
+        """
+        if not self.usage_tracker.check_limits('s3_puts'):
+            raise Exception("S3 PUT request limit reached")
+        
+        manifest_key = f"manifests/{asset_id}.json"
+        try:
+            await self._ensure_clients()
+            
+            # Store the batch list, then hand Lambda only its key; the
+            # handler processes every listed batch in that one invocation
+            await self.wait_for_rate_limit('s3_put')
+            await self.s3.put_object(
+                Bucket=self.bucket,
+                Key=manifest_key,
+                Body=orjson.dumps({
+                    'asset_id': asset_id,
+                    'batch_keys': batch_keys,
+                    'callback_url': self._callback_prefix + asset_id
+                }),
+                ContentType='application/json'
+            )
+            self.usage_tracker.record_usage('s3_puts')
+            
+            await self.wait_for_rate_limit('lambda_invoke')
+            response = await self.lambda_client.invoke(
+                FunctionName='process-video-frames',
+                InvocationType='Event',  # Async invocation
+                Payload=orjson.dumps({'bucket': self.bucket, 'manifest_key': manifest_key})
+            )
+            
+            return {
+                'status': 'processing',
+                'manifest_key': manifest_key,
+                'batch_count': len(batch_keys),
+                'request_id': response.get('ResponseMetadata', {}).get('RequestId')
+            }
+            
+        except Exception as e:
+            self.logger.error(f"Failed to trigger Lambda for manifest: {e}")
+            raise
+    
+    async def _uploader(self, batches: asyncio.Queue, keys: asyncio.Queue,
+                        asset_id: str, outcome: Dict[str, Any]):
+        """Pipeline stage: upload batches from the queue until a None sentinel"""
+        while (item := await batches.get()) is not None:
+            batch_num, frames = item
+            try:
+                await keys.put(await self.upload_frames_batch(frames, asset_id, batch_num))
+            except ProcessingError:
+                outcome['failures'] += 1  # Already recorded by upload_frames_batch
+            except Exception as e:
+                outcome['failures'] += 1
+                self._record_error('batch_error', {'batch_number': batch_num}, str(e))
+    
+    async def _invoker(self, keys: asyncio.Queue, asset_id: str, outcome: Dict[str, Any]):
+        """Pipeline stage: trigger Lambda for uploaded batches until a None sentinel"""
+        while (s3_key := await keys.get()) is not None:
+            if self.trigger_mode == 'manifest':
+                # Sent to Lambda in one invoke once every batch is uploaded
+                outcome['batch_keys'].append(s3_key)
+                continue
+            if self.trigger_mode == 's3_event':
+                # The manifest upload already queued the batch for Lambda
+                outcome['triggers'].append({'status': 'processing', 'batch_key': s3_key, 'request_id': None})
+                continue
+            try:
+                outcome['triggers'].append(await self.trigger_lambda_processing(s3_key, asset_id))
+            except Exception as e:
+                outcome['failures'] += 1
+                self._record_error('batch_error', {'batch_key': s3_key}, str(e))
+    
+    @staticmethod
+    def _probe_frame_count(file_path: str) -> int:
+        """Container frame count, or 0 if the video cannot be opened"""
+        cap = cv2.VideoCapture(file_path)
+        try:
+            return int(cap.get(cv2.CAP_PROP_FRAME_COUNT)) if cap.isOpened() else 0
+        finally:
+            cap.release()
+    
     async def process_video(self, file_path: str, asset_id: str) -> Dict[str, Any]:
         """Process a video file through the cloud pipeline with usage tracking"""
+        # Bind the per-video context once rather than on every log call
+        log = self.logger.bind(asset_id=asset_id, file_path=file_path)
         try:
             # Start cleanup task
             cleanup_task = asyncio.create_task(
@@ -382,8 +789,7 @@ class CloudProcessingManager:
             )
             self.cleanup_tasks.append(cleanup_task)
             
-            self.logger.info("Starting video processing",
-                       file_path=file_path,
+            log.info("Starting video processing",
                        settings={
                            'max_file_size': self.max_file_size,
                            'batch_size': self.batch_size
@@ -393,7 +799,7 @@ class CloudProcessingManager:
             self.processing_metrics['start_time'] = datetime.utcnow().isoformat()
             
             # Validate file size
-            file_size = os.path.getsize(file_path)
+            file_size = await asyncio.to_thread(os.path.getsize, file_path)
             if file_size > self.max_file_size:
                 raise ProcessingError(
                     message=f"File exceeds {self.max_file_size/1e6}MB limit",
@@ -401,112 +807,129 @@ class CloudProcessingManager:
                     context={'file_size': file_size, 'max_size': self.max_file_size}
                 )
             
-            # Get video properties
-            cap = cv2.VideoCapture(file_path)
-            if not cap.isOpened():
-                raise ProcessingError(
-                    message="Failed to open video file",
-                    error_type="video_open_error",
-                    context={'file_path': file_path}
-                )
-            frame_count = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
-            cap.release()
+            # Probe the frame count off the event loop while extraction starts;
+            # it is only needed for progress logging
+            loop = asyncio.get_running_loop()
+            frame_count_task = loop.run_in_executor(None, self._probe_frame_count, file_path)
             
-            # Extract scenes for intelligent sampling
-            try:
-                scenes = await self.frame_extractor.extract_scenes(file_path)
-                self.logger.info("Scene detection complete",
-                           asset_id=asset_id,
-                           scene_count=len(scenes))
-            except Exception as e:
-                self.logger.error("Scene detection failed",
-                            error=str(e),
-                            asset_id=asset_id)
-                scenes = []  # Fallback to basic processing
-            
-            # Process and upload frames in batches
+            # Process and upload frames in batches; scenes are detected on the
+            # same decoded frames rather than in a separate pass
             current_batch = []
             batch_num = 0
             total_frames = 0
-            processing_tasks = []
-            processing_start = time.time()
-            
-            async for frame_data in self.frame_extractor.extract_frames(file_path):
-                try:
-                    # Convert frame to bytes for storage
-                    frame_bytes = self.frame_extractor.frame_to_bytes(frame_data['frame'])
-                    frame_data['frame'] = frame_bytes.decode('latin1')
-                    current_batch.append(frame_data)
-                    total_frames += 1
-                    
-                    # Upload batch when full
-                    if len(current_batch) >= self.batch_size:
-                        batch_num += 1
-                        # Upload batch and trigger processing
-                        s3_key = await self.upload_frames_batch(current_batch, asset_id, batch_num)
-                        task = self.trigger_lambda_processing(s3_key, asset_id)
-                        processing_tasks.append(task)
-                        current_batch = []
-                        
-                        # Log progress
-                        progress = (total_frames / frame_count) * 100 if frame_count > 0 else 0
-                        self.logger.info("Processing progress",
-                                  asset_id=asset_id,
-                                  batch_num=batch_num,
-                                  frames_processed=total_frames,
-                                  progress=f"{progress:.1f}%")
+            scene_count = 0
+            # Progress factor, set once the probe finishes; 0 if the count is unknown
+            progress_scale = None
+            processing_start = time.perf_counter()
+            
+            # Extraction (this loop) -> uploaders -> invokers, connected by
+            # bounded queues; a full queue pauses the stage feeding it
+            batches = asyncio.Queue(maxsize=4)
+            keys = asyncio.Queue(maxsize=16)
+            outcome = {'triggers': [], 'failures': 0, 'batch_keys': []}
+            uploaders = [asyncio.create_task(self._uploader(batches, keys, asset_id, outcome))
+                         for _ in range(self.upload_concurrency)]
+            invokers = [asyncio.create_task(self._invoker(keys, asset_id, outcome))
+                        for _ in range(self.invoke_concurrency)]
+            
+            encode_pool = self._get_encode_pool()
+            try:
+                async for frames, metadata in prefetch(
+                        self.frame_extractor.extract_frame_batches(file_path, fuse_scenes=True),
+                        self.frame_prefetch):
+                    scene_count = max(scene_count, metadata[-1]['scene_id'] + 1)
+                    try:
+                        # Convert the chunk to JPEG bytes, one frame per encode thread
+                        encoded = await asyncio.gather(*(
+                            loop.run_in_executor(encode_pool, self.frame_extractor.frame_to_bytes, frame)
+                            for frame in frames
+                        ))
                         
-                except Exception as e:
-                    self.logger.error("Frame processing error",
-                               error=str(e),
-                               asset_id=asset_id,
-                               batch_num=batch_num,
-                               frame_number=total_frames)
-                    self.processing_errors.append({
-                        'timestamp': datetime.utcnow().isoformat(),
-                        'type': 'frame_processing_error',
-                        'details': {
+                        for frame_bytes, frame_metadata in zip(encoded, metadata):
+                            current_batch.append({'frame': frame_bytes, 'metadata': frame_metadata})
+                            total_frames += 1
+                            
+                            # Hand the batch to the uploaders when full
+                            if len(current_batch) >= self.batch_size:
+                                batch_num += 1
+                                await batches.put((batch_num, current_batch))
+                                current_batch = []
+                                
+                                # Log progress
+                                if batch_num % self.log_every == 0:
+                                    if progress_scale is None:
+                                        frame_count = await frame_count_task
+                                        progress_scale = 100 / frame_count if frame_count > 0 else 0
+                                    progress = total_frames * progress_scale
+                                    log.info("Processing progress",
+                                              batch_num=batch_num,
+                                              frames_processed=total_frames,
+                                              progress=f"{progress:.1f}%")
+                            
+                    except Exception as e:
+                        log.error("Frame processing error",
+                                   error=str(e),
+                                   batch_num=batch_num,
+                                   frame_number=total_frames)
+                        self._record_error('frame_processing_error', {
                             'frame_number': total_frames,
                             'batch_number': batch_num
-                        },
-                        'message': str(e)
-                    })
-                    continue
-            
-            # Upload final batch if any frames remain
-            if current_batch:
-                batch_num += 1
-                s3_key = await self.upload_frames_batch(current_batch, asset_id, batch_num)
-                task = self.trigger_lambda_processing(s3_key, asset_id)
-                processing_tasks.append(task)
-            
-            # Wait for all Lambda triggers to complete
-            results = await asyncio.gather(*processing_tasks, return_exceptions=True)
+                        }, str(e))
+                        continue
+                
+                # Upload final batch if any frames remain
+                if current_batch:
+                    batch_num += 1
+                    await batches.put((batch_num, current_batch))
+                
+                log.info("Scene detection complete",
+                           scene_count=scene_count)
+                
+                # Drain the pipeline stage by stage
+                for _ in uploaders:
+                    await batches.put(None)
+                await asyncio.gather(*uploaders)
+                for _ in invokers:
+                    await keys.put(None)
+                await asyncio.gather(*invokers)
+                
+                if outcome['batch_keys']:
+                    try:
+                        outcome['triggers'].append(
+                            await self.trigger_manifest_processing(outcome['batch_keys'], asset_id))
+                    except Exception as e:
+                        outcome['failures'] += 1
+                        self._record_error('manifest_error', {'batch_count': len(outcome['batch_keys'])}, str(e))
+            finally:
+                # Stop any workers left running if extraction failed
+                for worker in uploaders + invokers:
+                    worker.cancel()
+                await asyncio.gather(frame_count_task, return_exceptions=True)
             
             # Calculate processing metrics
-            processing_time = time.time() - processing_start
+            processing_time = time.perf_counter() - processing_start
             frames_per_second = total_frames / processing_time if processing_time > 0 else 0
             
             # Compile final results
             final_results = {
                 'status': 'processing',
                 'asset_id': asset_id,
-                'scenes_detected': len(scenes),
+                'scenes_detected': scene_count,
                 'frames_processed': total_frames,
                 'batches_uploaded': batch_num,
                 'processing_time': processing_time,
                 'frames_per_second': frames_per_second,
-                'errors': self.processing_errors,
-                'lambda_triggers': [r for r in results if not isinstance(r, Exception)],
+                'errors_recent': list(self.processing_errors),
+                'errors_total': self.error_count,
+                'lambda_triggers': outcome['triggers'],
+                'lambda_failures': outcome['failures'],
                 'metrics': self.processing_metrics,
                 'usage_stats': self.usage_tracker.get_usage_stats()
             }
             
-            # Fixed: Pass final_results without asset_id to avoid duplication
+            # Pass final_results without asset_id; it is already bound
             log_results = {k: v for k, v in final_results.items() if k != 'asset_id'}
-            self.logger.info("Processing complete",
-                       asset_id=asset_id,
-                       **log_results)
+            log.info("Processing complete", **log_results)
             
             return final_results
             
@@ -516,10 +939,10 @@ class CloudProcessingManager:
                 'asset_id': asset_id,
                 'error': str(e),
                 'error_type': type(e).__name__,
-                'errors': self.processing_errors
+                'errors_recent': list(self.processing_errors),
+                'errors_total': self.error_count
             }
-            # Fixed: Log error without asset_id to avoid duplication
-            self.logger.error("Processing failed",
+            log.error("Processing failed",
                         error=str(e),
                         traceback=True)
             return {
@@ -537,5 +960,10 @@ class CloudProcessingManager:
         """Get current usage statistics"""
         return self.usage_tracker.get_usage_stats()
 
-# Create singleton instance
-processing_manager = CloudProcessingManager() 
\ No newline at end of file
+@lru_cache(maxsize=1)
+def get_processing_manager() -> CloudProcessingManager:
+    """
+    Shared manager instance, created on first use rather than at import.
+    Closing it drops it from the cache; the next call builds a new one.
+    """
+    return CloudProcessingManager()
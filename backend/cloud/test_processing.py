@@ -52,8 +52,9 @@ async def test_cloud_processing():
     print(f"✅ Found test video: {os.path.basename(test_video)}")
     
     # Test processing
-    result = await manager.process_video(test_video, 'test-001')
-    print(f"✅ Processing result: {result}")
+    async with manager:
+        result = await manager.process_video(test_video, 'test-001')
+        print(f"✅ Processing result: {result}")
 
 if __name__ == '__main__':
     asyncio.run(test_cloud_processing()) 
\ No newline at end of file
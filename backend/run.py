@@ -9,18 +9,12 @@ import os
 import sys
 from app import create_app, socketio
 from app.config import Config
+from app.logger import setup_queued_logging
 import logging
 import warnings
 
-# Configure logging
-logging.basicConfig(
-    level=logging.DEBUG,
-    format='%(asctime)s [%(levelname)s] %(message)s',
-    handlers=[
-        logging.StreamHandler(),
-        logging.FileHandler('logs/backend.log')
-    ]
-)
+# Configure logging; records are written by a background listener
+setup_queued_logging(level=logging.DEBUG)
 
 logger = logging.getLogger(__name__)
 
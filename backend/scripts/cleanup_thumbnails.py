@@ -12,7 +12,7 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 import logging
 from backend.app.config import Config
-from typing import Set
+from typing import List, Set
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -50,12 +50,20 @@ class MediaAsset(db.Model):
     audio_channels = db.Column(db.Integer)
     audio_sample_rate = db.Column(db.Integer)
 
-def get_valid_asset_ids() -> Set[str]:
-    """Get set of valid asset IDs from database"""
+# Thumbnail IDs checked per IN query
+ID_BATCH_SIZE = 500
+
+def get_valid_asset_ids(stems: List[str]) -> Set[str]:
+    """Return the thumbnail stems that match an asset ID in the database"""
+    candidates = [int(stem) for stem in stems if stem.isdigit()]
+    valid_ids = set()
     with app.app_context():
-        # Get all asset IDs
-        assets = MediaAsset.query.all()
-        return {str(asset.id) for asset in assets}
+        # Let the database match IDs in batches instead of loading every ID
+        for i in range(0, len(candidates), ID_BATCH_SIZE):
+            batch = candidates[i:i + ID_BATCH_SIZE]
+            valid_ids.update(str(asset_id) for asset_id in db.session.scalars(
+                db.select(MediaAsset.id).where(MediaAsset.id.in_(batch))))
+    return valid_ids
 
 def cleanup_thumbnails() -> tuple[int, int]:
     """
@@ -72,39 +80,40 @@ def cleanup_thumbnails() -> tuple[int, int]:
         logger.error(f"Thumbnails directory not found: {thumbnails_dir}")
         return 0, 0
         
-    # Get valid asset IDs
-    valid_ids = get_valid_asset_ids()
-    logger.info(f"Found {len(valid_ids)} assets in database")
+    scrubbing = []
+    main_thumbs = {}  # stem -> path
+    
+    # Sort thumbnails from one directory listing, e.g. "123.jpg" or "123_0.jpg"
+    with os.scandir(thumbnails_dir) as entries:
+        for entry in entries:
+            if entry.name.startswith('.') or not entry.name.endswith('.jpg'):
+                continue
+            file_stem = entry.name[:-4]
+            
+            # Scrubbing thumbnails contain an underscore
+            if '_' in file_stem:
+                scrubbing.append(entry.path)
+            else:
+                main_thumbs[file_stem] = entry.path
+    
+    # Main thumbnails are kept only if they belong to a valid asset
+    valid_ids = get_valid_asset_ids(list(main_thumbs))
+    logger.info(f"Found {len(valid_ids)} thumbnails with assets in database")
+    kept_count = len(valid_ids)
+    orphaned = [path for stem, path in main_thumbs.items() if stem not in valid_ids]
     
+    logger.info(f"Found {len(scrubbing)} scrubbing and {len(orphaned)} orphaned thumbnails")
+    
+    # Delete in one pass, logging totals rather than every file
     deleted_count = 0
-    kept_count = 0
+    for path in scrubbing + orphaned:
+        try:
+            os.unlink(path)
+            deleted_count += 1
+            logger.debug(f"Deleted thumbnail: {path}")
+        except OSError as e:
+            logger.error(f"Error deleting {path}: {e}")
     
-    # Process all thumbnails
-    for thumb_file in thumbnails_dir.glob('*.jpg'):
-        file_stem = thumb_file.stem  # e.g., "123" or "123_0"
-        
-        # Check if this is a scrubbing thumbnail (contains underscore)
-        if '_' in file_stem:
-            try:
-                thumb_file.unlink()
-                deleted_count += 1
-                logger.info(f"Deleted scrubbing thumbnail: {thumb_file.name}")
-            except Exception as e:
-                logger.error(f"Error deleting {thumb_file}: {e}")
-            continue
-            
-        # For main thumbnails, check if they belong to a valid asset
-        if file_stem in valid_ids:
-            kept_count += 1
-            logger.debug(f"Keeping main thumbnail: {thumb_file.name}")
-        else:
-            try:
-                thumb_file.unlink()
-                deleted_count += 1
-                logger.info(f"Deleted orphaned thumbnail: {thumb_file.name}")
-            except Exception as e:
-                logger.error(f"Error deleting {thumb_file}: {e}")
-                
     return deleted_count, kept_count
 
 if __name__ == '__main__':
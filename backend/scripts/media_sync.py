@@ -7,6 +7,7 @@ Handles synchronization between local media directory and Google Drive backup.
 import os
 import shutil
 import logging
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
 from datetime import datetime
 from pathlib import Path
 from dotenv import load_dotenv
@@ -18,6 +19,11 @@ logging.basicConfig(
 )
 logger = logging.getLogger('media_sync')
 
+# Parallel copies, overlapping backup-drive latency with the directory walk
+COPY_WORKERS = 8
+# Copies queued ahead of the workers before the walk waits
+MAX_PENDING = 64
+
 def load_config():
     """Load configuration from environment variables."""
     load_dotenv()
@@ -35,6 +41,26 @@ def ensure_directories(local_path, backup_path):
         return False
     return True
 
+def iter_files(root):
+    """Yield a DirEntry for every non-hidden file under root, one scandir per directory."""
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                # Skip hidden files and directories (.DS_Store, ._* resource
+                # forks, .Trashes, ...) on the name alone, before any stat
+                if entry.name[0] == '.':
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif not entry.is_dir():  # Like os.walk, skip symlinked directories
+                    yield entry
+
+def copy_file(src_file, dst_file):
+    """Copy a file and its metadata; the destination directory must exist."""
+    shutil.copyfile(src_file, dst_file)  # sendfile/fcopyfile where available
+    shutil.copystat(src_file, dst_file)
+
 def sync_media(local_path, backup_path):
     """Synchronize media files between local and backup paths."""
     try:
@@ -42,22 +68,40 @@ def sync_media(local_path, backup_path):
         for subdir in ['videos', 'images', 'temp']:
             Path(os.path.join(local_path, subdir)).mkdir(parents=True, exist_ok=True)
         
-        # Sync from backup to local
-        for root, _, files in os.walk(backup_path):
-            for file in files:
-                if file.startswith('.'):  # Skip hidden files
-                    continue
-                    
-                src_file = os.path.join(root, file)
+        # Sync from backup to local: the walk queues stale files while
+        # COPY_WORKERS threads copy them, with at most MAX_PENDING in flight
+        with ThreadPoolExecutor(max_workers=COPY_WORKERS) as pool:
+            pending = {}
+            seen_dirs = set()  # Destination directories already created
+            for entry in iter_files(backup_path):
+                src_file = entry.path
                 rel_path = os.path.relpath(src_file, backup_path)
                 dst_file = os.path.join(local_path, rel_path)
                 
-                # Only copy if file doesn't exist or is newer
-                if not os.path.exists(dst_file) or \
-                   os.path.getmtime(src_file) > os.path.getmtime(dst_file):
-                    os.makedirs(os.path.dirname(dst_file), exist_ok=True)
-                    shutil.copy2(src_file, dst_file)
-                    logger.info(f"Synced: {rel_path}")
+                # Only copy if file doesn't exist or is newer; the source mtime
+                # comes from the directory listing, the destination needs one stat
+                try:
+                    stale = entry.stat(follow_symlinks=False).st_mtime > os.stat(dst_file).st_mtime
+                except FileNotFoundError:
+                    stale = True
+                if not stale:
+                    continue
+                
+                dst_dir = os.path.dirname(dst_file)
+                if dst_dir not in seen_dirs:
+                    os.makedirs(dst_dir, exist_ok=True)
+                    seen_dirs.add(dst_dir)
+                
+                if len(pending) >= MAX_PENDING:
+                    done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        future.result()
+                        logger.info(f"Synced: {pending.pop(future)}")
+                pending[pool.submit(copy_file, src_file, dst_file)] = rel_path
+            
+            for future in as_completed(pending):
+                future.result()
+                logger.info(f"Synced: {pending[future]}")
         
         return True
     except Exception as e:
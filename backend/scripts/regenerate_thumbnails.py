@@ -3,6 +3,7 @@
 import os
 import sys
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 # Add backend directory to Python path
@@ -11,6 +12,7 @@ sys.path.append(str(backend_dir))
 
 from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy.orm import load_only
 from backend.app.utils.thumbnail import ensure_thumbnail
 from backend.app.config import Config
 import logging
@@ -64,12 +66,25 @@ class MediaAsset(db.Model):
             path = Path(str(path).replace(str(media_path), '').lstrip('/'))
         return media_path / path
 
+def _thumb_worker(job: tuple) -> tuple:
+    """Generate one thumbnail in a worker process; returns (thumb_path, error)"""
+    asset_id, _, video_path, thumbnails_dir = job
+    try:
+        return ensure_thumbnail(Path(video_path), Path(thumbnails_dir), asset_id), None
+    except Exception as e:
+        return None, str(e)
+
 def regenerate_thumbnails():
     """Regenerate thumbnails for all assets"""
     with app.app_context():
-        # Get all assets
-        assets = MediaAsset.query.all()
-        logger.info(f"Found {len(assets)} assets in database")
+        # Count, then stream assets in chunks with only the columns used here
+        asset_count = db.session.scalar(db.select(db.func.count(MediaAsset.id)))
+        logger.info(f"Found {asset_count} assets in database")
+        assets = db.session.scalars(
+            db.select(MediaAsset)
+            .options(load_only(MediaAsset.id, MediaAsset.title, MediaAsset.file_path))
+            .execution_options(yield_per=500)
+        )
         
         # Create thumbnails directory if it doesn't exist
         thumbnails_dir = Config.THUMBNAIL_DIR
@@ -79,28 +94,30 @@ def regenerate_thumbnails():
         success_count = 0
         error_count = 0
         
-        # Process each asset
+        # Collect jobs for assets whose video is present
+        jobs = []
         for asset in assets:
-            try:
-                video_path = asset.get_absolute_path()
-                if not video_path.exists():
-                    logger.error(f"Video file not found: {video_path}")
+            video_path = asset.get_absolute_path()
+            if not video_path.exists():
+                logger.error(f"Video file not found: {video_path}")
+                error_count += 1
+                continue
+            jobs.append((asset.id, asset.title, str(video_path), str(thumbnails_dir)))
+        
+        # Run ffmpeg jobs in parallel, capped to limit disk contention;
+        # workers only write files, results are tallied here
+        with ProcessPoolExecutor(max_workers=min(8, os.cpu_count() or 1)) as executor:
+            for (asset_id, title, _, _), (thumb_path, error) in zip(
+                    jobs, executor.map(_thumb_worker, jobs, chunksize=4)):
+                if error:
                     error_count += 1
-                    continue
-                
-                # Generate new thumbnail
-                thumb_path = ensure_thumbnail(video_path, thumbnails_dir, asset.id)
-                if thumb_path:
+                    logger.error(f"Error processing {title}: {error}")
+                elif thumb_path:
                     success_count += 1
-                    logger.info(f"Generated thumbnail for {asset.title}")
+                    logger.info(f"Generated thumbnail for {title}")
                 else:
                     error_count += 1
-                    logger.error(f"Failed to generate thumbnail for {asset.title}")
-                    
-            except Exception as e:
-                error_count += 1
-                logger.error(f"Error processing {asset.title}: {e}")
-                continue
+                    logger.error(f"Failed to generate thumbnail for {title}")
         
         # Commit changes to database
         try:
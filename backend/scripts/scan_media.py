@@ -4,9 +4,12 @@ from flask import Flask
 from flask_sqlalchemy import SQLAlchemy
 from pathlib import Path
 from backend.app.utils.extract_metadata import extract_metadata
+from backend.app.utils.file_utils import iter_media_files
 from backend.app.utils.thumbnail import ensure_thumbnail
 from backend.app.config import Config  # Import Config class
+from backend.app.database import enable_fast_sqlite_writes
 import os
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Initialize Flask app
@@ -21,12 +24,16 @@ thumbnails_dir.mkdir(exist_ok=True)
 # Configure database
 app.config['SQLALCHEMY_DATABASE_URI'] = Config.SQLALCHEMY_DATABASE_URI
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+app.config['SQLALCHEMY_ECHO'] = False
 
 # Media directory from Config
 MEDIA_PATH = Config.MEDIA_PATH
 
-# Initialize database
-db = SQLAlchemy(app)
+# Assets inserted per transaction while scanning
+BATCH_SIZE = 500
+
+# Initialize database; rows are flushed explicitly per batch
+db = SQLAlchemy(app, session_options={'autoflush': False})
 
 class MediaAsset(db.Model):
     """Media asset model with essential metadata"""
@@ -52,18 +59,50 @@ class MediaAsset(db.Model):
 
 # Scan media files
 with app.app_context():
+    enable_fast_sqlite_writes(db.engine)
+    
     # Recreate tables
     db.drop_all()
     db.create_all()
     print("Database initialized")
     
+    def save_batch(batch):
+        """
+        Insert a batch of (asset, file_path) pairs, thumbnail them and commit.
+        Returns the number of assets saved; a failed batch is rolled back.
+        """
+        try:
+            db.session.add_all(asset for asset, _ in batch)
+            db.session.flush()  # Assign IDs for thumbnail names in one round trip
+            for asset, file_path in batch:
+                # A failed thumbnail only costs that asset its thumbnail
+                try:
+                    thumb_path = ensure_thumbnail(file_path, thumbnails_dir, asset.id)
+                except Exception as e:
+                    print(f"Error creating thumbnail for {file_path}: {e}")
+                    continue
+                if thumb_path:
+                    asset.thumbnail_path = thumb_path
+            db.session.commit()
+            return len(batch)
+        except Exception as e:
+            db.session.rollback()
+            print(f"Error saving batch of {len(batch)} assets: {e}")
+            return 0
+        finally:
+            batch.clear()
+    
     # Scan directory
     new_files = 0
-    for ext in Config.ALLOWED_EXTENSIONS:  # Use Config.ALLOWED_EXTENSIONS
-        for file_path in MEDIA_PATH.glob(f"**/*{ext}"):
+    batch = []
+    # One walk over the tree for all extensions (Config.ALLOWED_EXTENSIONS)
+    file_paths = [Path(entry.path) for entry in iter_media_files(MEDIA_PATH, Config.ALLOWED_EXTENSIONS)]
+    
+    # Probe files in parallel. Each probe is an ffprobe subprocess, so threads
+    # overlap them without re-running this module-level script in child processes
+    with ThreadPoolExecutor(max_workers=os.cpu_count()) as pool:
+        for file_path, metadata in zip(file_paths, pool.map(extract_metadata, file_paths)):
             try:
-                # Extract metadata
-                metadata = extract_metadata(file_path)
                 if not metadata:
                     continue
                 
@@ -84,25 +123,24 @@ with app.app_context():
                     bit_rate=metadata.get('bit_rate')
                 )
                 
-                # Add to database to get ID
-                db.session.add(asset)
-                db.session.flush()
-                
-                # Generate thumbnail
-                thumb_path = ensure_thumbnail(file_path, thumbnails_dir, asset.id)
-                if thumb_path:
-                    asset.thumbnail_path = thumb_path
-                
-                new_files += 1
+                # Queue for insert; thumbnails are generated once the batch has IDs
+                batch.append((asset, file_path))
                 print(f"Added: {file_path.name}")
                 
             except Exception as e:
                 print(f"Error processing {file_path}: {e}")
                 continue
+            
+            # Saved outside the per-file handler so batch errors are not
+            # blamed on the file that filled the batch
+            if len(batch) >= BATCH_SIZE:
+                new_files += save_batch(batch)
+    
+    # Commit remaining assets
+    if batch:
+        new_files += save_batch(batch)
     
-    # Commit changes
     if new_files > 0:
-        db.session.commit()
         print(f"\nScan complete. Added {new_files} new files.")
     else:
         print("\nNo new files found.")
@@ -0,0 +1,63 @@
+"""Tests for the single-pass media directory walkers"""
+
+import os
+
+import pytest
+
+file_utils = pytest.importorskip('app.utils.file_utils')
+media_sync = pytest.importorskip('scripts.media_sync')
+
+@pytest.fixture
+def media_tree(tmp_path):
+    """A small library with mixed-case suffixes, hidden names and a symlink loop."""
+    (tmp_path / 'clip.MP4').write_bytes(b'')
+    (tmp_path / 'notes.txt').write_bytes(b'')
+    (tmp_path / '.hidden.mp4').write_bytes(b'')
+    (tmp_path / 'sub').mkdir()
+    (tmp_path / 'sub' / 'take.mov').write_bytes(b'')
+    (tmp_path / '.cache').mkdir()
+    (tmp_path / '.cache' / 'proxy.mp4').write_bytes(b'')
+    # Points back at the root; following it would walk forever
+    os.symlink(tmp_path, tmp_path / 'sub' / 'loop', target_is_directory=True)
+    return tmp_path
+
+def relative_names(entries, root):
+    return sorted(os.path.relpath(entry.path, root) for entry in entries)
+
+def test_iter_media_files_matches_suffix_case_insensitively(media_tree):
+    """Suffixes match regardless of case and with or without a leading dot."""
+    found = relative_names(file_utils.iter_media_files(media_tree, ['.mp4', 'MOV']), media_tree)
+    assert 'clip.MP4' in found
+    assert os.path.join('sub', 'take.mov') in found
+    assert 'notes.txt' not in found
+
+def test_iter_media_files_includes_hidden_names(media_tree):
+    """Hidden names are not filtered; callers only get what the suffixes select."""
+    found = relative_names(file_utils.iter_media_files(media_tree, ['.mp4']), media_tree)
+    assert '.hidden.mp4' in found
+    assert os.path.join('.cache', 'proxy.mp4') in found
+
+def test_iter_media_files_does_not_follow_directory_symlinks(media_tree):
+    """A symlinked directory is neither descended into nor yielded."""
+    found = relative_names(file_utils.iter_media_files(media_tree, ['.mp4', '.mov']), media_tree)
+    assert found == sorted([
+        '.hidden.mp4',
+        'clip.MP4',
+        os.path.join('.cache', 'proxy.mp4'),
+        os.path.join('sub', 'take.mov'),
+    ])
+
+def test_media_sync_iter_files_skips_hidden_names(media_tree):
+    """Hidden files and everything under hidden directories are skipped."""
+    found = relative_names(media_sync.iter_files(media_tree), media_tree)
+    assert '.hidden.mp4' not in found
+    assert os.path.join('.cache', 'proxy.mp4') not in found
+
+def test_media_sync_iter_files_does_not_follow_directory_symlinks(media_tree):
+    """A symlinked directory is neither descended into nor yielded as a file."""
+    found = relative_names(media_sync.iter_files(media_tree), media_tree)
+    assert found == sorted([
+        'clip.MP4',
+        'notes.txt',
+        os.path.join('sub', 'take.mov'),
+    ])
@@ -0,0 +1,101 @@
+"""Tests for the cloud pipeline's rate limiting and prefetch helpers"""
+
+import asyncio
+import sys
+import time
+from pathlib import Path
+
+import pytest
+
+# processing_manager imports frame_extractor as a top-level module
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'cloud'))
+processing_manager = pytest.importorskip('processing_manager')
+TokenBucket = processing_manager.TokenBucket
+prefetch = processing_manager.prefetch
+
+def run(coro, timeout: float = 2.0):
+    """Run a coroutine, failing instead of hanging if it never finishes"""
+    return asyncio.run(asyncio.wait_for(coro, timeout))
+
+def test_token_bucket_allows_burst():
+    """A full bucket hands out its whole capacity without waiting."""
+    async def burst():
+        bucket = TokenBucket(rate=1, capacity=5)
+        start = time.monotonic()
+        for _ in range(5):
+            await bucket.acquire()
+        return time.monotonic() - start
+
+    assert run(burst()) < 0.1
+
+def test_token_bucket_waits_when_empty():
+    """Once drained, the next token arrives at the refill rate."""
+    async def drain():
+        bucket = TokenBucket(rate=20, capacity=1)
+        await bucket.acquire()
+        start = time.monotonic()
+        await bucket.acquire()
+        return time.monotonic() - start
+
+    assert run(drain()) >= 0.04
+
+def test_token_bucket_rejects_amount_over_capacity():
+    """Asking for more than the bucket can hold fails instead of hanging."""
+    with pytest.raises(ValueError):
+        run(TokenBucket(rate=1, capacity=1).acquire(2))
+
+@pytest.mark.parametrize('rate', [0, -1])
+def test_token_bucket_rejects_non_positive_rate(rate):
+    """A bucket that never refills is a configuration error."""
+    with pytest.raises(ValueError):
+        TokenBucket(rate=rate, capacity=1)
+
+def test_prefetch_yields_items_in_order():
+    """All items come through unchanged and in order."""
+    async def source():
+        for i in range(10):
+            yield i
+
+    async def collect():
+        return [item async for item in prefetch(source(), 2)]
+
+    assert run(collect()) == list(range(10))
+
+def test_prefetch_propagates_source_errors():
+    """Items produced before a failure are delivered, then the error is raised."""
+    async def source():
+        yield 1
+        yield 2
+        raise RuntimeError("decode failed")
+
+    async def collect(received):
+        async for item in prefetch(source(), 2):
+            received.append(item)
+
+    received = []
+    with pytest.raises(RuntimeError, match="decode failed"):
+        run(collect(received))
+    assert received == [1, 2]
+
+def test_prefetch_stops_producer_on_early_exit():
+    """Breaking out of the loop cancels the producer and closes the source."""
+    closed = asyncio.Event()
+
+    async def source():
+        try:
+            i = 0
+            while True:
+                yield i
+                i += 1
+        finally:
+            closed.set()
+
+    async def take_first():
+        items = prefetch(source(), 2)
+        async for item in items:
+            break
+        await items.aclose()
+        await asyncio.wait_for(closed.wait(), 1.0)
+        return item
+
+    assert run(take_first()) == 0
@@ -9,16 +9,21 @@ backend_dir = Path(__file__).parent.parent
 sys.path.append(str(backend_dir))
 
 from flask import Flask
-from backend.app.database import db
+from backend.app.database import db, enable_fast_sqlite_writes
 from backend.app.models import MediaAsset, MediaDirectory, Tag, ProcessingResult
 from backend.app.utils.extract_metadata import extract_metadata
+from backend.app.utils.file_utils import iter_media_files
 import logging
 import os
+from concurrent.futures import ProcessPoolExecutor
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Assets inserted per transaction while scanning
+BATCH_SIZE = 500
+
 def create_app():
     """Create Flask app for database initialization"""
     app = Flask(__name__)
@@ -29,6 +34,7 @@ def create_app():
     
     app.config['SQLALCHEMY_DATABASE_URI'] = f'sqlite:///{data_dir}/merged.db'
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['SQLALCHEMY_ECHO'] = False
     app.config['DATA_DIR'] = str(data_dir)
     
     # Initialize database
@@ -42,6 +48,8 @@ def init_database():
     app.app_context().push()
     
     try:
+        enable_fast_sqlite_writes(db.engine)
+        
         # Drop and recreate all tables
         logger.info("Dropping existing tables...")
         db.drop_all()
@@ -55,15 +63,18 @@ def init_database():
             logger.error(f"Media directory not found: {media_dir}")
             return
         
-        # Scan for media files
+        # Scan for media files, committing every BATCH_SIZE assets
         new_files = 0
+        batch = []
         allowed_extensions = ['.mp4', '.mov', '.avi', '.mkv']
         
-        for ext in allowed_extensions:
-            for file_path in media_dir.glob(f"**/*{ext}"):
+        file_paths = [Path(entry.path) for entry in iter_media_files(media_dir, allowed_extensions)]
+        
+        # Probe files in parallel (one ffprobe per file); rows are built
+        # and committed here in the main process
+        with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool, db.session.no_autoflush:
+            for file_path, metadata in zip(file_paths, pool.map(extract_metadata, file_paths, chunksize=8)):
                 try:
-                    # Extract metadata
-                    metadata = extract_metadata(file_path)
                     if not metadata:
                         logger.warning(f"No metadata extracted for {file_path}")
                         continue
@@ -88,16 +99,24 @@ def init_database():
                         audio_sample_rate=metadata.get('audio_sample_rate')
                     )
                     
-                    db.session.add(asset)
+                    batch.append(asset)
                     new_files += 1
                     logger.info(f"Added: {file_path.name}")
                     
+                    if len(batch) >= BATCH_SIZE:
+                        db.session.add_all(batch)
+                        db.session.commit()
+                        batch.clear()
+                    
                 except Exception as e:
                     logger.error(f"Error processing {file_path}: {e}")
                     continue
         
-        if new_files > 0:
+        if batch:
+            db.session.add_all(batch)
             db.session.commit()
+        
+        if new_files > 0:
             logger.info(f"Scan complete. Added {new_files} new files.")
         else:
             logger.info("No new files found.")
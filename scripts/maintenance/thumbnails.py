@@ -34,6 +34,10 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Concurrent ffmpeg jobs; capped below the core count so parallel reads
+# don't thrash the media disk (lower it further for spinning drives)
+MAX_WORKERS = int(os.getenv('THUMBNAIL_WORKERS', min(os.cpu_count() or 1, 6)))
+
 def create_app():
     """Create Flask app with database configuration"""
     try:
@@ -45,15 +49,24 @@ def create_app():
         logger.error(f"Failed to create app: {e}")
         raise
 
-def process_media_asset(asset):
+def get_absolute_path(file_path: str) -> Path:
+    """Get absolute path to media file"""
+    path = Path(file_path)
+    if path.is_absolute() and path.exists():
+        return path
+    
+    media_path = Path(Config.MEDIA_PATH)
+    return media_path / file_path
+
+def process_media_asset(asset_id: int, asset_file_path: str):
     """Process a single media asset"""
     try:
-        file_path = asset.get_absolute_path()
+        file_path = get_absolute_path(asset_file_path)
         if not file_path.exists():
             logger.warning(f"File not found: {file_path}")
             return False
             
-        thumbnail_path = ensure_thumbnail(str(file_path))
+        thumbnail_path = ensure_thumbnail(file_path, Config.THUMBNAIL_DIR, asset_id)
         if thumbnail_path:
             logger.debug(f"Generated thumbnail for: {file_path}")
             return True
@@ -61,7 +74,7 @@ def process_media_asset(asset):
             logger.warning(f"Failed to generate thumbnail for: {file_path}")
             return False
     except Exception as e:
-        logger.error(f"Error processing {asset.file_path}: {e}")
+        logger.error(f"Error processing {asset_file_path}: {e}")
         return False
 
 def regenerate_thumbnails():
@@ -83,19 +96,10 @@ def regenerate_thumbnails():
             file_path = db.Column(db.String(1024), unique=True, nullable=False)
             file_size = db.Column(db.BigInteger)
             duration = db.Column(db.Float)
-            
-            def get_absolute_path(self) -> Path:
-                """Get absolute path to media file"""
-                path = Path(self.file_path)
-                if path.is_absolute() and path.exists():
-                    return path
-                
-                media_path = Path(Config.MEDIA_PATH)
-                return media_path / self.file_path
         
         with app.app_context():
-            # Get all media assets
-            assets = MediaAsset.query.all()
+            # Fetch only (id, file_path) rows; workers need nothing else
+            assets = db.session.execute(db.select(MediaAsset.id, MediaAsset.file_path)).all()
             total_assets = len(assets)
             logger.info(f"Found {total_assets} media assets")
             
@@ -105,8 +109,9 @@ def regenerate_thumbnails():
             
             # Process assets in parallel
             success_count = 0
-            with ThreadPoolExecutor(max_workers=os.cpu_count()) as executor:
-                futures = {executor.submit(process_media_asset, asset): asset for asset in assets}
+            with ThreadPoolExecutor(max_workers=MAX_WORKERS) as executor:
+                futures = {executor.submit(process_media_asset, asset_id, file_path): asset_id
+                           for asset_id, file_path in assets}
                 
                 with tqdm(total=total_assets, desc="Regenerating thumbnails") as pbar:
                     for future in as_completed(futures):